@@ -1,6 +1,20 @@
 """静态分析核心包。"""
 
-from .runner import AnalyzerRunner
+from __future__ import annotations
 
-__all__ = ["AnalyzerRunner"]
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - 仅供类型检查
+    from .runner import AnalyzerRunner
+
+
+def __getattr__(name: str):
+    # 按需加载运行器：仅导入子模块 (如读取缓存默认路径) 时不必加载全部检查器
+    if name == "AnalyzerRunner":
+        from .runner import AnalyzerRunner
 
+        return AnalyzerRunner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["AnalyzerRunner"]
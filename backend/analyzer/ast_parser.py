@@ -2,24 +2,104 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 from pathlib import Path
-from typing import List
+from typing import Dict, Optional, Sequence
 
 from .utils import load_clang
 
 
+DEFAULT_TU_CACHE_DIR = Path.home() / ".cache" / "bai" / "tu"
+
+
 class ASTParser:
-    """为分析器提供 clang TranslationUnit。"""
+    """为分析器提供 clang TranslationUnit。
+
+    指定 `cache_dir` 时，解析结果会序列化为 `.ast` 文件，按路径、编译参数与解析选项的
+    摘要命名，同名的 `.sha256` 文件记录生成时的源码内容摘要；再次解析内容未变的文件时
+    直接加载，省去预处理与语义分析。修改后重新解析会覆盖同一条目，目录不会随编辑增长。
+    被 include 的头文件由 libclang 在加载时校验 (修改时间与大小)，头文件变化后加载失败，
+    随即重新解析并覆盖缓存。
 
-    def __init__(self, compile_args: List[str]):
+    指定 `reuse_translation_units` 时，为每个路径保留 TranslationUnit 并生成预编译前导
+    (preamble)；再次解析同一路径 (如 `--watch` 模式) 时调用 `reparse()`，头文件部分直接
+    复用前导而无需重新处理。
+    """
+
+    def __init__(
+        self,
+        compile_args: Sequence[str],
+        detailed_preprocessing: bool = False,
+        cache_dir: Optional[Path] = None,
+        reuse_translation_units: bool = False,
+    ):
         self.compile_args = compile_args
         self.cindex = load_clang()
         self.index = self.cindex.Index.create()
+        # 详细预处理记录 (宏展开等) 会显著拖慢解析，仅在有检查器需要时开启
+        self.options = 0
+        if detailed_preprocessing:
+            self.options |= self.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.reuse_translation_units = reuse_translation_units
+        self._units: Dict[tuple, object] = {}
+
+    def parse(self, source: Path, options: int | None = None):
+        if options is None:
+            options = self.options
+        if self.reuse_translation_units:
+            return self._parse_reusing(source, options)
+        if self.cache_dir is None:
+            return self.index.parse(str(source), args=self.compile_args, options=options)
+
+        key = self._cache_key(source, options)
+        cached = self.cache_dir / f"{key}.ast"
+        stamp = self.cache_dir / f"{key}.sha256"
+        content_hash = hashlib.sha256(Path(source).read_bytes()).hexdigest()
+        if cached.exists() and _read_stamp(stamp) == content_hash:
+            try:
+                return self.cindex.TranslationUnit.from_ast_file(str(cached), self.index)
+            except self.cindex.TranslationUnitLoadError:
+                # 头文件已修改、文件损坏或 libclang 版本不兼容时退回重新解析
+                pass
+
+        translation_unit = self.index.parse(str(source), args=self.compile_args, options=options)
+        try:
+            translation_unit.save(str(cached))
+        except self.cindex.TranslationUnitSaveError:
+            return translation_unit
+        # 先写 `.ast` 再写摘要：中途失败时摘要与内容不符，下次只会重新解析
+        stamp.write_text(content_hash, encoding="ascii")
+        return translation_unit
+
+    def _parse_reusing(self, source: Path, options: int):
+        key = (str(source), options)
+        translation_unit = self._units.get(key)
+        if translation_unit is not None:
+            # reparse 会从磁盘重新读取源码，前导未失效时跳过头文件处理
+            translation_unit.reparse()
+            return translation_unit
+        translation_unit = self.index.parse(
+            str(source),
+            args=self.compile_args,
+            options=options | self.cindex.TranslationUnit.PARSE_PRECOMPILED_PREAMBLE,
+        )
+        self._units[key] = translation_unit
+        return translation_unit
+
+    def _cache_key(self, source: Path, options: int) -> str:
+        payload = json.dumps([str(source), list(self.compile_args), options])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-    def parse(self, source: Path):
-        options = self.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
-        return self.index.parse(str(source), args=self.compile_args, options=options)
 
+def _read_stamp(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="ascii")
+    except OSError:
+        return None
 
-__all__ = ["ASTParser"]
 
+__all__ = ["ASTParser", "DEFAULT_TU_CACHE_DIR"]
@@ -11,6 +11,8 @@ from .report import Issue
 
 class Checker(ABC):
     name: str
+    # 需要宏展开等预处理信息的检查器置为 True
+    needs_preprocessing_record: bool = False
 
     @abstractmethod
     def run(self, context: AnalysisContext) -> Iterable[Issue]:
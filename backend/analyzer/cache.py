@@ -0,0 +1,123 @@
+"""基于 SQLite 的分析结果缓存。
+
+以 (源文件路径, 分析选项摘要) 为主键保存最近一次的检测结果，并记录源码内容的
+SHA-256、缓存版本号以及被 include 的头文件状态 (修改时间与大小)。再次分析同一文件时，
+若内容、选项与头文件均未改变则直接复用结果，跳过 clang 解析与全部检查器。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+from .report import Issue
+
+# 检查器逻辑或 Issue 结构变化时递增，使旧缓存自动失效
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "bai" / "ast.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    source TEXT NOT NULL,
+    options_hash TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    issues TEXT NOT NULL,
+    deps TEXT NOT NULL,
+    PRIMARY KEY (source, options_hash)
+)
+"""
+
+
+def hash_content(source: Path) -> str:
+    """计算源码内容的 SHA-256。"""
+
+    # Python 3.11+ 的 file_digest 分块读取文件，无需先把整个文件读入内存
+    if hasattr(hashlib, "file_digest"):
+        with open(source, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    return hashlib.sha256(source.read_bytes()).hexdigest()
+
+
+def _stamp_dependencies(paths: Iterable[str]) -> Optional[List[list]]:
+    """记录头文件的 (路径, 修改时间, 大小)；任一文件无法访问时返回 None。"""
+
+    stamps: List[list] = []
+    for path in sorted(set(paths)):
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+        stamps.append([path, stat.st_mtime_ns, stat.st_size])
+    return stamps
+
+
+def hash_options(compile_args: Sequence[str], stop_on_error: bool) -> str:
+    """计算影响检测结果的分析选项摘要。"""
+
+    payload = json.dumps([list(compile_args), stop_on_error], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """持久化保存每个源文件的检测结果。"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        with self._conn:
+            # 表结构随 CACHE_VERSION 变化时直接重建，旧结果本就已失效
+            (user_version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if user_version != CACHE_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS analysis")
+                self._conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+            self._conn.execute(_SCHEMA)
+
+    def load(self, source: Path, options_hash: str, content_hash: str) -> Optional[List[Issue]]:
+        """命中时返回缓存的 Issue 列表，否则返回 None。"""
+
+        row = self._conn.execute(
+            "SELECT content_hash, version, issues, deps FROM analysis WHERE source = ? AND options_hash = ?",
+            (str(source), options_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        cached_hash, version, payload, deps = row
+        if cached_hash != content_hash or version != CACHE_VERSION:
+            return None
+        stamps = json.loads(deps)
+        if _stamp_dependencies(path for path, _, _ in stamps) != stamps:
+            return None
+        return [Issue.from_dict(item) for item in json.loads(payload)]
+
+    def store(
+        self,
+        source: Path,
+        options_hash: str,
+        content_hash: str,
+        issues: Sequence[Issue],
+        dependencies: Iterable[str] = (),
+    ) -> None:
+        """保存检测结果；`dependencies` 为被 include 的头文件路径。"""
+
+        stamps = _stamp_dependencies(dependencies)
+        if stamps is None:
+            return
+        payload = json.dumps([issue.to_dict() for issue in issues], ensure_ascii=False)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis (source, options_hash, content_hash, version, issues, deps) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(source), options_hash, content_hash, CACHE_VERSION, payload, json.dumps(stamps)),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+__all__ = ["AnalysisCache", "CACHE_VERSION", "DEFAULT_CACHE_PATH", "hash_content", "hash_options"]
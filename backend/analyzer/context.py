@@ -2,16 +2,71 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .utils import collect_source_tree, collect_tokens, find_includes
 
 
 @dataclass(slots=True)
 class AnalysisContext:
     source: Path
     translation_unit: "clang.cindex.TranslationUnit"  # type: ignore[name-defined]
-    compile_args: List[str]
+    compile_args: Sequence[str]
+    _nodes: Optional[List[Tuple[object, Optional[object]]]] = field(default=None, init=False, repr=False)
+    _tree: Optional[Dict[object, Tuple[List[object], Optional[object]]]] = field(default=None, init=False, repr=False)
+    _tokens: Dict[object, List[str]] = field(default_factory=dict, init=False, repr=False)
+    _includes: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False)
+    _paths: Dict[str, Path] = field(default_factory=dict, init=False, repr=False)
+
+    def location(self, cursor) -> Tuple[Path, int, Optional[int]]:
+        """与 utils.cursor_location 相同，但同一文件名只构造一次 Path。"""
+
+        start = cursor.extent.start
+        file = start.file
+        name = file.name if file else "<unknown>"
+        path = self._paths.get(name)
+        if path is None:
+            path = self._paths[name] = Path(name)
+        return path, start.line, start.column
+
+    @property
+    def includes(self) -> FrozenSet[str]:
+        """翻译单元 (含间接) 包含的头文件名，首次访问时计算。"""
+
+        if self._includes is None:
+            self._includes = frozenset(find_includes(self.translation_unit))
+        return self._includes
+
+    def walk(self) -> List[Tuple[object, Optional[object]]]:
+        """返回源文件内全部游标 (先序) 及其所在函数。
+
+        整棵 AST 只遍历一次，结果在各检查器之间共享。
+        """
+
+        if self._nodes is None:
+            self._nodes, self._tree = collect_source_tree(self.translation_unit.cursor, self.source)
+        return self._nodes
+
+    def children(self, cursor) -> List[object]:
+        """返回游标的子节点，源文件内的游标直接取自共享遍历的结果。"""
+
+        if self._tree is None:
+            self.walk()
+        try:
+            return self._tree[cursor][0]
+        except KeyError:
+            return list(cursor.get_children())
+
+    def tokens(self, cursor) -> List[str]:
+        """返回游标范围内的 token 文本，结果在各检查器之间共享，调用方不应修改。"""
+
+        try:
+            return self._tokens[cursor]
+        except KeyError:
+            tokens = self._tokens[cursor] = list(collect_tokens(cursor))
+            return tokens
 
 
 __all__ = ["AnalysisContext"]
@@ -2,12 +2,47 @@
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional, Set
+import re
+from collections import ChainMap, namedtuple
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 from .base import Checker
 from .context import AnalysisContext
-from .report import Issue, Suggestion
-from .utils import collect_tokens, cursor_location, iter_children, load_clang
+from .report import Issue, make_suggestion
+from .utils import evaluate_integer, load_clang
+
+
+_ALLOC_NAMES = frozenset(("malloc", "calloc", "realloc"))
+_FREE_NAMES = frozenset(("free",))
+_NULL_LITERALS = frozenset(("NULL", "0", "nullptr"))
+_RHS_PUNCTUATION = frozenset((";", ",", "(", ")"))
+# 去重键中的问题类别（占 2 位）
+_REPORT_UNINITIALIZED = 0
+_REPORT_NULL = 1
+_REPORT_UAF = 2
+_REPORT_DOUBLE_FREE = 3
+# 数组下标常量：可选负号 + 十六进制/八进制/十进制整数
+_INDEX_LITERAL = re.compile(r"(-?)(0[xX][0-9a-fA-F]+|0[0-7]*|[1-9][0-9]*)")
+
+
+# 遍历期间只记录构造函数与参数，遍历结束后统一生成 Issue
+_PendingIssue = namedtuple("_PendingIssue", "builder args")
+
+
+@dataclass(slots=True)
+class _TokenScan:
+    """单次扫描节点 token 得到的摘要。"""
+
+    tokens: List[str]
+    eq_index: Optional[int] = None
+    has_null: bool = False
+    has_star: bool = False
+    has_arrow: bool = False
+
+    @property
+    def last(self) -> Optional[str]:
+        return self.tokens[-1] if self.tokens else None
 
 
 class MemorySafetyChecker(Checker):
@@ -18,9 +53,19 @@ class MemorySafetyChecker(Checker):
         self._global_array_sizes: Dict[str, int] = {}
         self._leaky_functions: Set[str] = set()
         self._unsafe_pointer_returners: Set[str] = set()
+        self._cindex = None
+        # 依赖 clang 绑定的游标种类集合，在 run() 中加载绑定后构建一次
+        self._record_kinds: frozenset = frozenset()
+        self._wrapper_kinds: frozenset = frozenset()
+        # 子节点与 token 取自各检查器共享的 AnalysisContext，仅在 run() 期间持有
+        self._context: Optional[AnalysisContext] = None
 
     def run(self, context: AnalysisContext) -> Iterable[Issue]:
-        cindex = load_clang()
+        # 每次运行只加载一次 clang 绑定，辅助方法统一读取 self._cindex
+        cindex = self._cindex = load_clang()
+        kinds = cindex.CursorKind
+        self._record_kinds = frozenset((kinds.STRUCT_DECL, kinds.UNION_DECL))
+        self._wrapper_kinds = frozenset((kinds.PAREN_EXPR, kinds.UNEXPOSED_EXPR))
         issues: List[Issue] = []
 
         self._global_uninitialized.clear()
@@ -28,32 +73,35 @@ class MemorySafetyChecker(Checker):
         self._leaky_functions.clear()
         self._unsafe_pointer_returners.clear()
 
-        for cursor in context.translation_unit.cursor.get_children():
-            if cursor.location.file and cursor.location.file.name != str(context.source):
-                continue
-
+        # 顶层声明必须按源码顺序串行处理：全局指针/数组只对其后的函数可见，
+        # 且 `_unsafe_pointer_returners` 会影响之后函数中对返回值的判定，
+        # 因此不能把各函数拆分到线程池或进程池中并行检查。
+        # 共享遍历已剔除其他文件 (如头文件) 中的声明
+        self._context = context
+        for cursor in context.children(context.translation_unit.cursor):
             if cursor.kind == cindex.CursorKind.VAR_DECL:
                 issues.extend(self._check_pointer_initialization(cursor))
                 self._collect_global_array(cursor)
             elif cursor.kind == cindex.CursorKind.FUNCTION_DECL:
                 issues.extend(self._check_function(cursor))
 
+        self._context = None
         return issues
 
     def _check_pointer_initialization(self, cursor) -> Iterable[Issue]:
-        cindex = load_clang()
+        cindex = self._cindex
         if cursor.type.kind != cindex.TypeKind.POINTER:
             return []
 
-        initialized = any(True for _ in cursor.get_children())
+        initialized = next(cursor.get_children(), None) is not None
         if initialized:
             return []
 
         if cursor.spelling:
             self._global_uninitialized.add(cursor.spelling)
 
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="在声明时初始化指针或在首次使用前赋值",
             detail="例如: `int *ptr = NULL;` 并确保使用前检查是否为空。",
         )
@@ -69,25 +117,87 @@ class MemorySafetyChecker(Checker):
             )
         ]
 
-    def _check_function(self, cursor) -> Iterable[Issue]:
-        cindex = load_clang()
+    def _function_is_interesting(self, cursor) -> bool:
+        """快速预扫描函数子树：只看游标种类，判断是否可能产生内存问题。
+
+        没有指针声明、数组下标、分配/释放调用，也未引用未初始化全局指针的函数
+        既不会产生问题，也不会更新泄漏/野指针返回函数表，可直接跳过完整遍历。
+        """
+
+        cindex = self._cindex
+        kinds = cindex.CursorKind
+        decl_kinds = (kinds.VAR_DECL, kinds.PARM_DECL)
+        POINTER = cindex.TypeKind.POINTER
+        global_uninitialized = self._global_uninitialized
+        stack = [cursor]
+        while stack:
+            node = stack.pop()
+            stack.extend(self._children(node))
+            kind = node.kind
+            if kind in decl_kinds:
+                if node.type.kind == POINTER:
+                    return True
+            elif kind == kinds.ARRAY_SUBSCRIPT_EXPR:
+                return True
+            elif kind == kinds.CALL_EXPR:
+                callee = self._resolve_callee(node)
+                if callee in _ALLOC_NAMES or callee in _FREE_NAMES:
+                    return True
+            elif kind == kinds.DECL_REF_EXPR and global_uninitialized:
+                if node.spelling in global_uninitialized:
+                    return True
+        return False
 
-        issues: List[Issue] = []
+    def _check_function(self, cursor) -> Iterable[Issue]:
+        cindex = self._cindex
+        if not self._function_is_interesting(cursor):
+            return []
+        kinds = cindex.CursorKind
+        VAR_DECL = kinds.VAR_DECL
+        PARM_DECL = kinds.PARM_DECL
+        FUNCTION_DECL = kinds.FUNCTION_DECL
+        BINARY_OPERATOR = kinds.BINARY_OPERATOR
+        CALL_EXPR = kinds.CALL_EXPR
+        UNARY_OPERATOR = kinds.UNARY_OPERATOR
+        MEMBER_REF_EXPR = kinds.MEMBER_REF_EXPR
+        ARRAY_SUBSCRIPT_EXPR = kinds.ARRAY_SUBSCRIPT_EXPR
+        RETURN_STMT = kinds.RETURN_STMT
+        IF_STMT = kinds.IF_STMT
+        RECORD_DECLS = self._record_kinds
+        POINTER = cindex.TypeKind.POINTER
+        CONSTANTARRAY = cindex.TypeKind.CONSTANTARRAY
+
+        pending: List[_PendingIssue] = []
         pointer_null: Set[str] = set()
         local_uninitialized: Set[str] = set()
         pointer_vars: Set[str] = set()
         freed_pointers: Set[str] = set()
-        reported_uninitialized: Set[tuple[str, int, int]] = set()
-        reported_null: Set[tuple[str, int, int]] = set()
-        reported_uaf: Set[tuple[str, int, int]] = set()
-        reported_double_free: Set[tuple[str, int, int]] = set()
-        reported_leaky_calls: Set[tuple[str, int, int]] = set()
+        # 所有已报告问题共用一个去重集合，键为 (行, 列, 指针编号, 问题类别) 打包成的整数
+        reported: Set[int] = set()
+        name_ids: Dict[str, int] = {}
 
-        array_sizes: Dict[str, int] = dict(self._global_array_sizes)
+        # 局部数组写入前层映射 (同名时遮蔽全局数组)，全局表只读共享，无需逐函数复制
+        array_sizes: ChainMap[str, int] = ChainMap({}, self._global_array_sizes)
         allocation_calls = 0
         free_calls = 0
         returns_uninitialized_pointer = False
 
+        # guard 集合哈希共享：相同内容的集合只保留一份，并记忆 (guards, 新增名) 的并集结果
+        guard_sets: Dict[frozenset[str], frozenset[str]] = {}
+        guard_unions: Dict[tuple[frozenset[str], frozenset[str]], frozenset[str]] = {}
+
+        def extend_guards(guards: frozenset[str], names) -> frozenset[str]:
+            if not names:
+                return guards
+            added = frozenset(names)
+            key = (guards, added)
+            try:
+                return guard_unions[key]
+            except KeyError:
+                union = guards | added
+                result = guard_unions[key] = guard_sets.setdefault(union, union)
+                return result
+
         def add_pointer_var(name: Optional[str]) -> None:
             if name:
                 pointer_vars.add(name)
@@ -99,187 +209,240 @@ class MemorySafetyChecker(Checker):
             pointer_null.discard(name)
             freed_pointers.discard(name)
 
+        # 指针别名集合：`p = q` 后两者指向同一块内存，释放其一则全部失效。
+        # 对 p 的重新赋值会使其脱离原集合，因此集合之间无需合并。
+        alias_classes: Dict[str, Set[str]] = {}
+
+        def detach_alias(name: str) -> None:
+            members = alias_classes.pop(name, None)
+            if members is not None:
+                members.discard(name)
+
+        def assign_alias(target: str, source: str) -> None:
+            detach_alias(target)
+            members = alias_classes.setdefault(source, {source})
+            members.add(target)
+            alias_classes[target] = members
+            # target 继承 source 当前的空/未初始化/已释放状态
+            for state in (pointer_null, local_uninitialized, freed_pointers):
+                if source in state:
+                    state.add(target)
+                else:
+                    state.discard(target)
+            if source in self._global_uninitialized:
+                local_uninitialized.add(target)
+
+        # 去重键只在确实命中某类问题时才计算，且只读取一次 location（每次访问都跨越 FFI）
+        def first_report(category: int, name: str, node) -> bool:
+            location = node.location
+            name_id = name_ids.setdefault(name, len(name_ids))
+            key = (((location.line << 32 | (location.column or 0)) << 32 | name_id) << 2) | category
+            if key in reported:
+                return False
+            reported.add(key)
+            return True
+
         def report_pointer_use(
             name: Optional[str],
             node,
             *,
             allow_freed: bool = False,
-            guards: Optional[Set[str]] = None,
+            guards: frozenset[str] = frozenset(),
         ) -> None:
             if not name:
                 return
-            guards = guards or set()
-            location_key = (name, node.location.line, node.location.column or 0)
             if name in freed_pointers and not allow_freed:
-                if location_key not in reported_uaf:
-                    reported_uaf.add(location_key)
-                    issues.append(self._build_use_after_free_issue(node, name))
+                if first_report(_REPORT_UAF, name, node):
+                    pending.append(_PendingIssue(self._build_use_after_free_issue, (node, name)))
                 return
             if name in pointer_null and name not in guards and name not in freed_pointers:
-                if location_key not in reported_null:
-                    reported_null.add(location_key)
-                    issues.append(self._build_null_deref_issue(node, name))
+                if first_report(_REPORT_NULL, name, node):
+                    pending.append(_PendingIssue(self._build_null_deref_issue, (node, name)))
                 return
             if name in local_uninitialized or name in self._global_uninitialized:
-                if location_key not in reported_uninitialized:
-                    reported_uninitialized.add(location_key)
-                    issues.append(self._build_uninitialized_pointer_issue(node, name))
+                if first_report(_REPORT_UNINITIALIZED, name, node):
+                    pending.append(_PendingIssue(self._build_uninitialized_pointer_issue, (node, name)))
                 local_uninitialized.discard(name)
 
-        # 收集形参与局部指针声明
-        for param in cursor.get_arguments() or []:
-            if param.type.kind == cindex.TypeKind.POINTER and param.spelling:
-                add_pointer_var(param.spelling)
+        # 以下各 handler 处理单一节点类型；返回新的 guard 集合时作用于该节点的子树
+        def handle_parm_decl(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            # 形参位于函数体之前，遍历到函数体时指针形参均已登记
+            if node.type.kind == POINTER:
+                add_pointer_var(node.spelling)
+            return None
 
-        for child in cursor.get_children():
-            if child.kind == cindex.CursorKind.PARM_DECL:
-                if child.type.kind == cindex.TypeKind.POINTER and child.spelling:
-                    add_pointer_var(child.spelling)
-                continue
+        def handle_var_decl(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            node_type = node.type
+            type_kind = node_type.kind
+            if type_kind == CONSTANTARRAY:
+                size = self._extract_array_size(node_type)
+                if node.spelling and size is not None:
+                    array_sizes[node.spelling] = size
+                return None
+            if type_kind != POINTER:
+                return None
+            parent = node.semantic_parent
+            if parent and parent.kind not in RECORD_DECLS:
+                name = node.spelling
+                if name:
+                    add_pointer_var(name)
+                    detach_alias(name)
+                    if not self._children(node):
+                        local_uninitialized.add(name)
+                    else:
+                        init_scan = self._scan_tokens(node)
+                        init_tokens = init_scan.tokens[init_scan.eq_index + 1 :] if init_scan.eq_index is not None else []
+                        if init_scan.has_null or init_scan.last == "0":
+                            pointer_null.add(name)
+                        elif len(init_tokens) == 1 and init_tokens[0] in pointer_vars and init_tokens[0] != name:
+                            assign_alias(name, init_tokens[0])
+                        else:
+                            mark_initialized(name)
+            return None
 
-            if child.kind == cindex.CursorKind.VAR_DECL and child.type.kind == cindex.TypeKind.POINTER:
-                if child.spelling:
-                    add_pointer_var(child.spelling)
-                init_children = list(child.get_children())
-                if not init_children:
-                    if child.spelling:
-                        local_uninitialized.add(child.spelling)
+        def handle_binary_operator(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            scan = self._scan_tokens(node)
+            if scan.eq_index is None:
+                return None
+            target = self._resolve_assignment_target(node)
+            rhs_cursor = self._resolve_assignment_rhs(node)
+            raw_rhs_tokens = self._tokens(rhs_cursor) if rhs_cursor else scan.tokens[scan.eq_index + 1 :]
+            rhs_tokens = [tok for tok in raw_rhs_tokens if tok not in _RHS_PUNCTUATION]
+            callee = self._resolve_callee(rhs_cursor) if rhs_cursor else None
+
+            if target and target in pointer_vars:
+                detach_alias(target)
+                if callee in _ALLOC_NAMES:
+                    mark_initialized(target)
+                elif callee and callee in self._unsafe_pointer_returners:
+                    local_uninitialized.add(target)
+                elif rhs_tokens and rhs_tokens[0] == "&":
+                    mark_initialized(target)
+                elif any(tok == "NULL" for tok in rhs_tokens) or (len(rhs_tokens) == 1 and rhs_tokens[0] in {"0", "nullptr"}):
+                    pointer_null.add(target)
+                    freed_pointers.discard(target)
+                    local_uninitialized.discard(target)
+                elif len(rhs_tokens) == 1 and rhs_tokens[0] in pointer_vars and rhs_tokens[0] != target:
+                    assign_alias(target, rhs_tokens[0])
                 else:
-                    init_tokens = list(collect_tokens(child))
-                    if child.spelling and ("NULL" in init_tokens or init_tokens[-1] == "0"):
-                        pointer_null.add(child.spelling)
-                    else:
-                        mark_initialized(child.spelling)
-            elif child.kind == cindex.CursorKind.VAR_DECL and child.type.kind == cindex.TypeKind.CONSTANTARRAY:
-                size = self._extract_array_size(child.type)
-                if child.spelling and size is not None:
-                    array_sizes[child.spelling] = size
-
-        def traverse(node, guards: frozenset[str]) -> None:
-            nonlocal allocation_calls, free_calls, returns_uninitialized_pointer
-            if node is cursor:
-                for child in node.get_children():
-                    traverse(child, guards)
-                return
+                    mark_initialized(target)
+            return None
 
-            if node.kind == cindex.CursorKind.FUNCTION_DECL:
-                return
+        def handle_call(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            nonlocal allocation_calls, free_calls
+            callee = self._resolve_callee(node)
+            extra_safe: Set[str] = set()
+            # 每个实参只解析一次引用名，供 free 检查与通用指针使用检查共用
+            named_arguments = []
+            for argument in node.get_arguments():
+                arg_name = self._resolve_decl_name(argument) or self._first_decl_ref_name(argument)
+                if arg_name:
+                    named_arguments.append((argument, arg_name))
+
+            if callee in _ALLOC_NAMES:
+                allocation_calls += 1
+            elif callee in _FREE_NAMES:
+                free_calls += 1
+                for argument, arg_name in named_arguments:
+                    if arg_name in freed_pointers and first_report(_REPORT_DOUBLE_FREE, arg_name, argument):
+                        pending.append(_PendingIssue(self._build_double_free_issue, (argument, arg_name)))
+                    report_pointer_use(arg_name, argument, allow_freed=True, guards=guards)
+                    for alias in alias_classes.get(arg_name, (arg_name,)):
+                        freed_pointers.add(alias)
+                        pointer_null.add(alias)
+                    extra_safe.add(arg_name)
+            else:
+                pass  # 避免在调用点重复报告泄漏/野指针返回
+
+            for argument, arg_name in named_arguments:
+                report_pointer_use(arg_name, argument, allow_freed=(callee in _FREE_NAMES), guards=guards)
+
+            if extra_safe:
+                return extend_guards(guards, extra_safe)
+            return None
 
-            tokens = list(collect_tokens(node))
-            child_guard_context = guards
+        def handle_unary_operator(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            if self._scan_tokens(node).has_star:
+                name = self._first_decl_ref_name(node)
+                report_pointer_use(name, node, guards=guards)
+            return None
 
-            if node.kind == cindex.CursorKind.VAR_DECL and getattr(node.type, "kind", None) == cindex.TypeKind.POINTER:
-                parent = node.semantic_parent
-                if parent and parent.kind not in {cindex.CursorKind.STRUCT_DECL, cindex.CursorKind.UNION_DECL}:
-                    name = node.spelling
-                    if name:
-                        add_pointer_var(name)
-                        init_children = list(node.get_children())
-                        if not init_children:
-                            local_uninitialized.add(name)
-                        else:
-                            init_tokens = [tok for tok in collect_tokens(node)]
-                            if "NULL" in init_tokens or (init_tokens and init_tokens[-1] == "0"):
-                                pointer_null.add(name)
-                            else:
-                                mark_initialized(name)
-
-            if node.kind == cindex.CursorKind.BINARY_OPERATOR and tokens and "=" in tokens:
-                target = self._resolve_assignment_target(node)
-                rhs_cursor = self._resolve_assignment_rhs(node)
-                raw_rhs_tokens = list(collect_tokens(rhs_cursor)) if rhs_cursor else tokens[tokens.index("=") + 1 :]
-                rhs_tokens = [tok for tok in raw_rhs_tokens if tok not in {";", ",", "(", ")"}]
-                callee = self._resolve_callee(rhs_cursor) if rhs_cursor else None
-
-                if target and target in pointer_vars:
-                    if callee in {"malloc", "calloc", "realloc"}:
-                        mark_initialized(target)
-                    elif callee and callee in self._unsafe_pointer_returners:
-                        local_uninitialized.add(target)
-                    elif rhs_tokens and rhs_tokens[0] == "&":
-                        mark_initialized(target)
-                    elif any(tok == "NULL" for tok in rhs_tokens) or (len(rhs_tokens) == 1 and rhs_tokens[0] in {"0", "nullptr"}):
-                        pointer_null.add(target)
-                        freed_pointers.discard(target)
-                        local_uninitialized.discard(target)
-                    else:
-                        mark_initialized(target)
+        def handle_member_ref(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            if self._scan_tokens(node).has_arrow:
+                node_children = self._children(node)
+                base_child = node_children[0] if node_children else None
+                base_name = self._resolve_decl_name(base_child) if base_child else self._first_decl_ref_name(node)
+                report_pointer_use(base_name, node, guards=guards)
+            return None
 
-            if node.kind == cindex.CursorKind.CALL_EXPR:
-                callee = self._resolve_callee(node)
-                extra_safe: Set[str] = set()
-                if callee in {"malloc", "calloc", "realloc"}:
-                    allocation_calls += 1
-                elif callee == "free":
-                    free_calls += 1
-                    for argument in node.get_arguments():
-                        arg_name = self._resolve_decl_name(argument) or self._first_decl_ref_name(argument)
-                        if not arg_name:
-                            continue
-                        location_key = (arg_name, argument.location.line, argument.location.column or 0)
-                        if arg_name in freed_pointers and location_key not in reported_double_free:
-                            reported_double_free.add(location_key)
-                            issues.append(self._build_double_free_issue(argument, arg_name))
-                        report_pointer_use(arg_name, argument, allow_freed=True, guards=set(guards))
-                        freed_pointers.add(arg_name)
-                        pointer_null.add(arg_name)
-                        extra_safe.add(arg_name)
-                else:
-                    pass  # 避免在调用点重复报告泄漏/野指针返回
+        def handle_array_subscript(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            children = self._children(node)
+            base_name = self._resolve_decl_name(children[0]) if children else None
+            report_pointer_use(base_name, node, guards=guards)
+            overflow = self._check_array_bounds(node, array_sizes)
+            if overflow:
+                pending.append(_PendingIssue(self._build_array_bounds_issue, (node, *overflow)))
+            return None
 
-                for argument in node.get_arguments():
-                    arg_name = self._resolve_decl_name(argument) or self._first_decl_ref_name(argument)
-                    if arg_name:
-                        report_pointer_use(arg_name, argument, allow_freed=(callee == "free"), guards=set(guards))
+        def handle_return(node, guards: frozenset[str]) -> Optional[frozenset[str]]:
+            nonlocal returns_uninitialized_pointer
+            decl_names = self._collect_decl_ref_names(node)
+            for name in decl_names:
+                if name in pointer_vars or name in self._global_uninitialized:
+                    report_pointer_use(name, node, guards=guards)
+                    if name in local_uninitialized or name in self._global_uninitialized:
+                        returns_uninitialized_pointer = True
+            return None
 
-                if extra_safe:
-                    child_guard_context = frozenset(set(guards).union(extra_safe))
+        handlers = {
+            PARM_DECL: handle_parm_decl,
+            VAR_DECL: handle_var_decl,
+            BINARY_OPERATOR: handle_binary_operator,
+            CALL_EXPR: handle_call,
+            UNARY_OPERATOR: handle_unary_operator,
+            MEMBER_REF_EXPR: handle_member_ref,
+            ARRAY_SUBSCRIPT_EXPR: handle_array_subscript,
+            RETURN_STMT: handle_return,
+        }
+
+        # 显式栈代替递归遍历：帧为 (节点, 守卫集合, IF 子节点)。IF 语句先压入一个
+        # 分支帧再压入条件，保证条件子树处理完毕后才提取守卫并展开各分支。
+        stack: List[Tuple[object, frozenset[str], Optional[List]]] = [
+            (child, frozenset(), None) for child in reversed(self._children(cursor))
+        ]
+        while stack:
+            node, guards, if_children = stack.pop()
+            if if_children is not None:
+                guarded = self._extract_guarded_pointers(if_children[0], pointer_vars)
+                then_guards = extend_guards(guards, guarded)
+                branches = [(branch, guards, None) for branch in reversed(if_children[2:])]
+                if len(if_children) >= 2:
+                    branches.append((if_children[1], then_guards, None))
+                stack.extend(branches)
+                continue
 
-            if node.kind == cindex.CursorKind.UNARY_OPERATOR and tokens and "*" in tokens:
-                name = self._first_decl_ref_name(node)
-                report_pointer_use(name, node, guards=set(guards))
+            kind = node.kind
+            if kind == FUNCTION_DECL:
+                continue
 
-            if node.kind == cindex.CursorKind.MEMBER_REF_EXPR and tokens and "->" in tokens:
-                base_child = next(iter(node.get_children()), None)
-                base_name = self._resolve_decl_name(base_child) if base_child else self._first_decl_ref_name(node)
-                report_pointer_use(base_name, node, guards=set(guards))
-
-            if node.kind == cindex.CursorKind.ARRAY_SUBSCRIPT_EXPR:
-                children = list(node.get_children())
-                base_name = self._resolve_decl_name(children[0]) if children else None
-                report_pointer_use(base_name, node, guards=set(guards))
-                array_issue = self._check_array_bounds(node, array_sizes)
-                if array_issue:
-                    issues.append(array_issue)
-
-            if node.kind == cindex.CursorKind.RETURN_STMT:
-                decl_names = self._collect_decl_ref_names(node)
-                for name in decl_names:
-                    if name in pointer_vars or name in self._global_uninitialized:
-                        report_pointer_use(name, node, guards=set(guards))
-                        if name in local_uninitialized or name in self._global_uninitialized:
-                            returns_uninitialized_pointer = True
-
-            if node.kind == cindex.CursorKind.IF_STMT:
-                children = list(node.get_children())
-                if not children:
-                    return
-                condition = children[0]
-                traverse(condition, guards)
-                guarded = self._extract_guarded_pointers(condition, pointer_vars)
-                then_guards = frozenset(set(guards).union(guarded))
-                if len(children) >= 2:
-                    traverse(children[1], then_guards)
-                if len(children) >= 3:
-                    traverse(children[2], guards)
-                for extra in children[3:]:
-                    traverse(extra, guards)
-                return
+            if kind == IF_STMT:
+                children = self._children(node)
+                if children:
+                    stack.append((node, guards, children))
+                    stack.append((children[0], guards, None))
+                continue
 
-            for child in node.get_children():
-                traverse(child, child_guard_context)
+            child_guard_context = guards
+            handler = handlers.get(kind)
+            if handler is not None:
+                extended = handler(node, guards)
+                if extended is not None:
+                    child_guard_context = extended
 
-        traverse(cursor, frozenset())
+            children = self._children(node)
+            stack.extend((child, child_guard_context, None) for child in reversed(children))
+
+        issues = [item.builder(*item.args) for item in pending]
 
         if allocation_calls > free_calls:
             issues.append(self._build_leak_issue(cursor, allocation_calls, free_calls))
@@ -291,28 +454,40 @@ class MemorySafetyChecker(Checker):
 
         return issues
 
-    def _walk(self, cursor):
-        yield cursor
-        cindex = load_clang()
-        for child in iter_children(cursor):
-            if child is cursor:
-                continue
-            if child.kind == cindex.CursorKind.FUNCTION_DECL:
-                continue
-            yield from self._walk(child)
+    def _scan_tokens(self, node) -> _TokenScan:
+        """一次遍历 token，同时记录后续判断所需的特征。"""
+
+        scan = _TokenScan(tokens=self._tokens(node))
+        for index, token in enumerate(scan.tokens):
+            if token == "=":
+                if scan.eq_index is None:
+                    scan.eq_index = index
+            elif token == "NULL":
+                scan.has_null = True
+            elif token == "*":
+                scan.has_star = True
+            elif token == "->":
+                scan.has_arrow = True
+        return scan
+
+    def _children(self, node) -> List[object]:
+        return self._context.children(node)
+
+    def _tokens(self, node) -> List[str]:
+        return self._context.tokens(node)
 
     def _resolve_assignment_target(self, node) -> Optional[str]:
-        children = list(node.get_children())
+        children = self._children(node)
         if not children:
             return None
         lhs = children[0]
-        cindex = load_clang()
+        cindex = self._cindex
         if lhs.kind == cindex.CursorKind.DECL_REF_EXPR:
             return self._resolve_decl_name(lhs) or lhs.spelling
         return None
 
     def _resolve_assignment_rhs(self, node):
-        children = list(node.get_children())
+        children = self._children(node)
         if len(children) < 2:
             return None
         return children[1]
@@ -326,87 +501,93 @@ class MemorySafetyChecker(Checker):
         name = getattr(node, "spelling", None) or getattr(node, "displayname", None)
         if not name:
             return None
-        return name.split("(")[0]
+        return name.partition("(")[0]
 
     def _first_decl_ref_name(self, node) -> Optional[str]:
-        cindex = load_clang()
-        for child in node.get_children():
-            if child.kind == cindex.CursorKind.DECL_REF_EXPR and child.spelling:
-                return child.spelling
-            result = self._first_decl_ref_name(child)
-            if result:
-                return result
+        """按先序返回子树中第一个具名 DECL_REF_EXPR 的名称（不含 node 本身）。"""
+
+        DECL_REF_EXPR = self._cindex.CursorKind.DECL_REF_EXPR
+        stack = list(reversed(self._children(node)))
+        while stack:
+            current = stack.pop()
+            if current.kind == DECL_REF_EXPR:
+                spelling = current.spelling
+                if spelling:
+                    return spelling
+            stack.extend(reversed(self._children(current)))
         return None
 
     def _collect_decl_ref_names(self, node) -> Set[str]:
-        cindex = load_clang()
+        DECL_REF_EXPR = self._cindex.CursorKind.DECL_REF_EXPR
         names: Set[str] = set()
-        for child in node.get_children():
-            if child.kind == cindex.CursorKind.DECL_REF_EXPR and child.spelling:
-                names.add(child.spelling)
-            names.update(self._collect_decl_ref_names(child))
+        stack = list(self._children(node))
+        while stack:
+            current = stack.pop()
+            if current.kind == DECL_REF_EXPR:
+                spelling = current.spelling
+                if spelling:
+                    names.add(spelling)
+            stack.extend(self._children(current))
         return names
 
     def _extract_guarded_pointers(self, condition, pointer_vars: Set[str]) -> Set[str]:
-        if condition is None:
-            return set()
-        cindex = load_clang()
-
-        if condition.kind in {
-            cindex.CursorKind.PAREN_EXPR,
-            cindex.CursorKind.UNEXPOSED_EXPR,
-        }:
-            children = list(condition.get_children())
-            guards: Set[str] = set()
-            for child in children:
-                guards |= self._extract_guarded_pointers(child, pointer_vars)
-            return guards
-
-        if condition.kind == cindex.CursorKind.BINARY_OPERATOR:
-            tokens = list(collect_tokens(condition))
-            children = list(condition.get_children())
-            if "&&" in tokens and len(children) >= 2:
-                guards: Set[str] = set()
-                guards |= self._extract_guarded_pointers(children[0], pointer_vars)
-                guards |= self._extract_guarded_pointers(children[1], pointer_vars)
-                return guards
-            if "||" in tokens:
-                return set()
-            if "!" in tokens and tokens.count("!") == 1 and len(children) == 1:
-                return set()
-            if "!=" in tokens and len(children) >= 2:
-                left = children[0]
-                right = children[1]
-                name = self._resolve_decl_name(left) or self._first_decl_ref_name(left)
-                right_tokens = {tok for tok in collect_tokens(right)}
-                if name and name in pointer_vars and right_tokens & {"NULL", "0", "nullptr"}:
-                    return {name}
-                name = self._resolve_decl_name(right) or self._first_decl_ref_name(right)
-                left_tokens = {tok for tok in collect_tokens(left)}
-                if name and name in pointer_vars and left_tokens & {"NULL", "0", "nullptr"}:
-                    return {name}
-            return set()
-
-        if condition.kind == cindex.CursorKind.DECL_REF_EXPR:
-            if condition.spelling in pointer_vars:
-                return {condition.spelling}
-            return set()
-
-        if condition.kind == cindex.CursorKind.UNARY_OPERATOR:
-            tokens = list(collect_tokens(condition))
-            if tokens and tokens[0] == "!":
-                return set()
-            child = next(condition.get_children(), None)
-            return self._extract_guarded_pointers(child, pointer_vars)
+        """收集条件成立时可确定非空的指针名；各子条件的结果取并集，与处理顺序无关。"""
 
+        kinds = self._cindex.CursorKind
         guards: Set[str] = set()
-        for child in condition.get_children():
-            guards |= self._extract_guarded_pointers(child, pointer_vars)
+        pending = [condition]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            kind = node.kind
+
+            if kind in self._wrapper_kinds:
+                pending.extend(self._children(node))
+                continue
+
+            if kind == kinds.BINARY_OPERATOR:
+                tokens = self._tokens(node)
+                children = self._children(node)
+                if "&&" in tokens and len(children) >= 2:
+                    pending.extend(children[:2])
+                    continue
+                if "||" in tokens:
+                    continue
+                if "!" in tokens and tokens.count("!") == 1 and len(children) == 1:
+                    continue
+                if "!=" in tokens and len(children) >= 2:
+                    left = children[0]
+                    right = children[1]
+                    name = self._resolve_decl_name(left) or self._first_decl_ref_name(left)
+                    if name and name in pointer_vars and not _NULL_LITERALS.isdisjoint(self._tokens(right)):
+                        guards.add(name)
+                        continue
+                    name = self._resolve_decl_name(right) or self._first_decl_ref_name(right)
+                    if name and name in pointer_vars and not _NULL_LITERALS.isdisjoint(self._tokens(left)):
+                        guards.add(name)
+                continue
+
+            if kind == kinds.DECL_REF_EXPR:
+                spelling = node.spelling
+                if spelling in pointer_vars:
+                    guards.add(spelling)
+                continue
+
+            if kind == kinds.UNARY_OPERATOR:
+                tokens = self._tokens(node)
+                if tokens and tokens[0] == "!":
+                    continue
+                children = self._children(node)
+                pending.append(children[0] if children else None)
+                continue
+
+            pending.extend(self._children(node))
         return guards
 
     def _build_null_deref_issue(self, cursor, name: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title=f"在解引用 `{name}` 前检查是否为空",
             detail="例如: `if ({0} == NULL) {{ /* 错误处理 */ }}`".format(name),
         )
@@ -421,8 +602,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_null_call_issue(self, cursor, name: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="在传入指针参数前进行空指针检查",
             detail=f"确保 `{name}` 在调用前已经被赋值为有效地址。",
         )
@@ -437,8 +618,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_uninitialized_pointer_issue(self, cursor, name: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title=f"在使用 `{name}` 前赋值有效地址",
             detail="例如将其指向现有变量或动态分配的内存。",
         )
@@ -453,8 +634,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_use_after_free_issue(self, cursor, name: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title=f"避免对 `{name}` 在释放后继续解引用",
             detail="释放内存后应立即将指针置为 NULL 或重新指向有效区域。",
         )
@@ -469,8 +650,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_double_free_issue(self, cursor, name: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="确保每块内存仅释放一次",
             detail="可在释放后将指针赋值为 NULL，避免重复释放。",
         )
@@ -485,8 +666,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_leaky_call_issue(self, cursor, callee: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="在调用后释放被分配的资源",
             detail=f"函数 `{callee}` 已被推断可能泄漏动态内存，调用后请确认资源释放。",
         )
@@ -501,8 +682,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_unsafe_return_call_issue(self, cursor, callee: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="校验返回的指针是否指向有效内存",
             detail=f"函数 `{callee}` 返回的指针可能未初始化或指向失效区域，使用前需验证。",
         )
@@ -517,8 +698,8 @@ class MemorySafetyChecker(Checker):
         )
 
     def _build_leak_issue(self, cursor, allocs: int, frees: int) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="为每一次动态分配配对调用 free",
             detail="考虑使用 goto/清理块或智能指针样式封装确保释放。",
         )
@@ -533,7 +714,7 @@ class MemorySafetyChecker(Checker):
         )
 
     def _collect_global_array(self, cursor) -> None:
-        cindex = load_clang()
+        cindex = self._cindex
         if cursor.type.kind != cindex.TypeKind.CONSTANTARRAY or not cursor.spelling:
             return
         size = self._extract_array_size(cursor.type)
@@ -551,11 +732,18 @@ class MemorySafetyChecker(Checker):
             return None
         return int(size)
 
-    def _check_array_bounds(self, cursor, array_sizes: Dict[str, int]) -> Optional[Issue]:
-        children = list(cursor.get_children())
+    def _check_array_bounds(self, cursor, array_sizes: Mapping[str, int]) -> Optional[tuple[str, int, int]]:
+        """越界时返回 (数组名, 索引, 数组大小)。"""
+        children = self._children(cursor)
         if len(children) < 2:
             return None
         base, index_node = children[0], children[1]
+        # 数组名作为下标基址时外面包着隐式的数组到指针转换 (UNEXPOSED_EXPR)
+        while base.kind in self._wrapper_kinds:
+            wrapped = self._children(base)
+            if len(wrapped) != 1:
+                return None
+            base = wrapped[0]
         base_name = self._resolve_decl_name(base)
         if not base_name:
             return None
@@ -567,8 +755,11 @@ class MemorySafetyChecker(Checker):
             return None
         if 0 <= index_value < size:
             return None
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        return base_name, index_value, size
+
+    def _build_array_bounds_issue(self, cursor, base_name: str, index_value: int, size: int) -> Issue:
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title=f"确保索引位于 0 到 {size - 1} 之间",
             detail=f"当前访问的索引为 {index_value}，已超出数组 `{base_name}` 的大小 {size}。",
         )
@@ -583,7 +774,7 @@ class MemorySafetyChecker(Checker):
         )
 
     def _resolve_decl_name(self, cursor) -> Optional[str]:
-        cindex = load_clang()
+        cindex = self._cindex
         if cursor.kind == cindex.CursorKind.DECL_REF_EXPR and cursor.spelling:
             referenced = cursor.referenced
             if referenced and referenced.spelling:
@@ -592,21 +783,23 @@ class MemorySafetyChecker(Checker):
         return None
 
     def _extract_constant_index(self, cursor) -> Optional[int]:
-        tokens = list(collect_tokens(cursor))
-        if not tokens:
+        # 优先交给 libclang 求值，可覆盖宏、sizeof 与算术常量表达式
+        value = evaluate_integer(cursor)
+        if value is not None:
+            return value
+        text = "".join(self._tokens(cursor))
+        match = _INDEX_LITERAL.fullmatch(text)
+        if not match:
             return None
-        text = "".join(tokens).replace(" ", "")
-        try:
-            # int(x, 0) 支持十六进制/八进制常量
-            return int(text, 0)
-        except ValueError:
-            # 处理一元负号情况，如 tokens 形如 ['-', '1']
-            if tokens[0] == "-" and len(tokens) == 2:
-                try:
-                    return -int(tokens[1], 0)
-                except ValueError:
-                    return None
-        return None
+        sign, digits = match.groups()
+        # 按 C 字面量规则解析十六进制/八进制/十进制常量
+        if digits[:2] in {"0x", "0X"}:
+            value = int(digits, 16)
+        elif digits.startswith("0"):
+            value = int(digits, 8)
+        else:
+            value = int(digits)
+        return -value if sign else value
 
 
 __all__ = ["MemorySafetyChecker"]
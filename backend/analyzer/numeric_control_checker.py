@@ -3,59 +3,95 @@
 from __future__ import annotations
 
 import re
-
 from typing import Dict, Iterable, List, Optional
 
 from .base import Checker
 from .context import AnalysisContext
 from .report import Issue, Suggestion
-from .utils import collect_tokens, cursor_location, iter_children, load_clang
+from .utils import binary_operator_kind, load_clang
+
+
+_COMPOUND_ASSIGN_OPS = frozenset(("+=", "-=", "*=", "/="))
+
+# CXBinaryOperatorKind 中的 CXBinaryOperator_Div
+_CXBINARY_DIV = 4
+
+_ZERO_LITERALS = frozenset(("0", "0.0", "0f", "0F"))
+
+_RELATIONAL = re.compile(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|<|>)\s*(.+)")
+_LEADING_IDENTIFIER = re.compile(r"\(?\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)?")
+_COMPARISON_CHAR = re.compile(r"[<>=]")
+
+# 内容固定的修复建议，所有 Issue 共享同一实例
+_DIVISION_SUGGESTION = Suggestion(
+    title="在执行除法前检查分母",
+    detail="如果分母可能为 0，可提前返回或抛出错误。",
+)
+_LOOP_SUGGESTION = Suggestion(
+    title="为循环添加退出条件或 break",
+    detail="确保循环条件可以变为假，或在循环体内加入跳出逻辑。",
+)
+_UNREACHABLE_SUGGESTION = Suggestion(
+    title="删除或移动不可达代码",
+    detail="如果需要执行，请调整控制流以确保执行到。",
+)
 
 
 class NumericControlChecker(Checker):
     name = "numeric-control"
 
+    def __init__(self) -> None:
+        self._cindex = None
+        # token 取自各检查器共享的 AnalysisContext，仅在 run() 期间持有
+        self._context: Optional[AnalysisContext] = None
+        # 依赖 clang 绑定的游标种类集合，在 run() 中加载绑定后构建一次
+        self._terminal_kinds: frozenset = frozenset()
+
     def run(self, context: AnalysisContext) -> Iterable[Issue]:
-        cindex = load_clang()
+        # 每次运行只加载一次 clang 绑定，辅助方法统一读取 self._cindex
+        cindex = self._cindex = load_clang()
+        kinds = cindex.CursorKind
+        BINARY_OPERATOR = kinds.BINARY_OPERATOR
+        COMPOUND_STMT = kinds.COMPOUND_STMT
+        LOOP_KINDS = frozenset((kinds.WHILE_STMT, kinds.FOR_STMT))
+        self._terminal_kinds = frozenset((kinds.RETURN_STMT, kinds.BREAK_STMT, kinds.CONTINUE_STMT))
         issues: List[Issue] = []
         first_infinite_loop_line: Dict[object, int] = {}
+        self._context = context
 
-        for node, func_cursor in self._walk(context.translation_unit.cursor, context):
-            if node.kind == cindex.CursorKind.BINARY_OPERATOR:
+        for node, func_cursor in context.walk():
+            kind = node.kind
+            if kind == BINARY_OPERATOR:
                 issues.extend(self._check_division(node))
-            elif node.kind in {cindex.CursorKind.WHILE_STMT, cindex.CursorKind.FOR_STMT}:
+            elif kind in LOOP_KINDS:
                 issues.extend(self._check_loop(node, func_cursor, first_infinite_loop_line))
-            elif node.kind == cindex.CursorKind.COMPOUND_STMT:
+            elif kind == COMPOUND_STMT:
                 issues.extend(self._check_unreachable(node))
 
+        self._context = None
         return issues
 
-    def _walk(self, cursor, context):
-        cindex = load_clang()
-        stack: List[tuple["clang.cindex.Cursor", Optional["clang.cindex.Cursor"]]] = [(cursor, None)]  # type: ignore[name-defined]
-        while stack:
-            current, func_cursor = stack.pop()
-            if current.location.file and current.location.file.name != str(context.source):
-                continue
-            yield current, func_cursor
-            next_func = func_cursor
-            if current.kind == cindex.CursorKind.FUNCTION_DECL:
-                next_func = current
-            children = list(current.get_children())
-            for child in reversed(children):
-                stack.append((child, next_func))
+    def _tokens(self, cursor) -> List[str]:
+        return self._context.tokens(cursor)
 
     def _check_division(self, cursor) -> Iterable[Issue]:
-        tokens = list(collect_tokens(cursor))
-        if "/" not in tokens:
+        # 先由 libclang 直接给出运算符种类，非除法节点无需 token 化
+        operator_kind = binary_operator_kind(cursor)
+        if operator_kind is not None and operator_kind != _CXBINARY_DIV:
             return []
-        slash_index = tokens.index("/")
-        if slash_index + 1 < len(tokens) and tokens[slash_index + 1] == "0":
-            file_path, line, column = cursor_location(cursor)
-            suggestion = Suggestion(
-                title="在执行除法前检查分母",
-                detail="如果分母可能为 0，可提前返回或抛出错误。",
-            )
+        children = self._context.children(cursor)
+        if len(children) != 2:
+            return []
+        lhs, rhs = children
+        rhs_start = rhs.extent.start
+        # 只在拿不到运算符种类时读取运算符 token：右操作数是头文件中定义的宏时，
+        # 两个操作数之间的区间跨越文件，读不到任何 token
+        if operator_kind is None and self._first_token(cursor, lhs.extent.end, rhs_start) != "/":
+            return []
+        # 操作数之间没有空白时 (如 `a/0`)，上面的区间不包含右操作数的首个 token，需单独读取
+        if self._first_token(cursor, rhs_start, rhs_start) == "0":
+            file_path, line, column = self._context.location(cursor)
+            suggestion = _DIVISION_SUGGESTION
             return [
                 Issue(
                     category="numeric",
@@ -69,28 +105,30 @@ class NumericControlChecker(Checker):
             ]
         return []
 
+    def _first_token(self, cursor, start, end) -> Optional[str]:
+        extent = self._cindex.SourceRange.from_locations(start, end)
+        token = next(cursor.translation_unit.get_tokens(extent=extent), None)
+        return token.spelling if token is not None else None
+
     def _check_loop(self, cursor, func_cursor, infinite_registry: Dict[object, int]) -> Iterable[Issue]:
+        # location 每次访问都会跨越 FFI，只读取一次行号
+        line = cursor.location.line if func_cursor is not None else None
         if func_cursor is not None:
             recorded = infinite_registry.get(func_cursor)
-            if recorded is not None and cursor.location.line and cursor.location.line > recorded:
+            if recorded is not None and line and line > recorded:
                 return []
 
-        tokens = list(collect_tokens(cursor))
-        text = "".join(tokens)
-        if self._loop_is_definitely_infinite(cursor, tokens=tokens, text=text):
+        if self._loop_is_definitely_infinite(cursor):
             if func_cursor is not None:
                 recorded = infinite_registry.get(func_cursor)
-                if recorded is None or (cursor.location.line and cursor.location.line < recorded):
-                    infinite_registry[func_cursor] = cursor.location.line or recorded or 0
+                if recorded is None or (line and line < recorded):
+                    infinite_registry[func_cursor] = line or recorded or 0
             return [self._build_loop_issue(cursor)]
         return []
 
     def _build_loop_issue(self, cursor) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
-            title="为循环添加退出条件或 break",
-            detail="确保循环条件可以变为假，或在循环体内加入跳出逻辑。",
-        )
+        file_path, line, column = self._context.location(cursor)
+        suggestion = _LOOP_SUGGESTION
         return Issue(
             category="control-flow",
             severity="warning",
@@ -101,37 +139,14 @@ class NumericControlChecker(Checker):
             suggestion=suggestion,
         )
 
-    def _is_reachable(self, cursor) -> bool:
-        cindex = load_clang()
-        parent = cursor.semantic_parent or cursor.lexical_parent
-        if not parent:
-            return True
+    def _loop_is_definitely_infinite(self, cursor) -> bool:
+        # 只需切分条件、增量与循环体，无需对整个循环做 token 化并拼接文本
+        kinds = self._cindex.CursorKind
+        kind = cursor.kind
 
-        siblings = list(parent.get_children())
-        cursor_file = str(cursor.location.file.name) if cursor.location.file else None
-        for child in siblings:
-            if child == cursor:
-                return True
-            child_file = str(child.location.file.name) if child.location.file else None
-            if child_file and cursor_file and child_file != cursor_file:
-                continue
-            if child.kind in {cindex.CursorKind.RETURN_STMT, cindex.CursorKind.BREAK_STMT}:
-                return False
-            if child.kind in {cindex.CursorKind.WHILE_STMT, cindex.CursorKind.FOR_STMT}:
-                tokens = list(collect_tokens(child))
-                text = "".join(tokens)
-                if self._loop_is_definitely_infinite(child, tokens=tokens, text=text):
-                    return False
-        return True
-
-    def _loop_is_definitely_infinite(self, cursor, *, tokens=None, text: str | None = None) -> bool:
-        cindex = load_clang()
-        tokens = tokens or list(collect_tokens(cursor))
-        text = text if text is not None else "".join(tokens)
-
-        if cursor.kind == cindex.CursorKind.WHILE_STMT:
+        if kind == kinds.WHILE_STMT:
             condition_cursor, body_cursor = self._split_while_children(cursor)
-            condition_text = "".join(collect_tokens(condition_cursor)) if condition_cursor else ""
+            condition_text = "".join(self._tokens(condition_cursor)) if condition_cursor else ""
             condition_clean = condition_text.replace(" ", "")
             if condition_clean in {"1", "(1)", "true", "(true)"}:
                 return True
@@ -140,16 +155,16 @@ class NumericControlChecker(Checker):
             if simple_var and not self._variable_modified(body_cursor, simple_var):
                 return True
 
-            relational_match = re.match(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|<|>)\s*(.+)", condition_clean)
+            relational_match = _RELATIONAL.match(condition_clean)
             if relational_match:
                 var = relational_match.group(1)
                 if not self._variable_modified(body_cursor, var):
                     return True
             return False
 
-        if cursor.kind == cindex.CursorKind.FOR_STMT:
+        if kind == kinds.FOR_STMT:
             init_cursor, cond_cursor, inc_cursor, body_cursor = self._split_for_children(cursor)
-            cond_text = "".join(collect_tokens(cond_cursor)) if cond_cursor else ""
+            cond_text = "".join(self._tokens(cond_cursor)) if cond_cursor else ""
             cond_clean = cond_text.replace(" ", "")
             if not cond_clean:
                 return True
@@ -158,7 +173,7 @@ class NumericControlChecker(Checker):
             if "!=" in cond_clean or "==" in cond_clean:
                 return True
 
-            relational_match = re.match(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|<|>)\s*(.+)", cond_clean)
+            relational_match = _RELATIONAL.match(cond_clean)
             if relational_match:
                 var, op, _ = relational_match.groups()
                 direction = self._analyze_increment(var, inc_cursor)
@@ -173,24 +188,24 @@ class NumericControlChecker(Checker):
         return False
 
     def _split_while_children(self, cursor):
-        cindex = load_clang()
+        COMPOUND_STMT = self._cindex.CursorKind.COMPOUND_STMT
         condition = None
         body = None
-        for child in cursor.get_children():
-            if child.kind == cindex.CursorKind.COMPOUND_STMT:
+        for child in self._context.children(cursor):
+            if child.kind == COMPOUND_STMT:
                 body = child
             elif condition is None:
                 condition = child
         return condition, body
 
     def _split_for_children(self, cursor):
-        cindex = load_clang()
+        COMPOUND_STMT = self._cindex.CursorKind.COMPOUND_STMT
         init = None
         condition = None
         increment = None
         body = None
-        for child in cursor.get_children():
-            if child.kind == cindex.CursorKind.COMPOUND_STMT:
+        for child in self._context.children(cursor):
+            if child.kind == COMPOUND_STMT:
                 body = child
             elif init is None:
                 init = child
@@ -204,94 +219,126 @@ class NumericControlChecker(Checker):
         if not condition_text:
             return None
         text = condition_text.strip()
-        match = re.match(r"\(?\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)?", text)
+        match = _LEADING_IDENTIFIER.match(text)
         if not match:
             return None
         symbol = match.group(1)
-        if re.search(r"[<>=]", text):
+        if _COMPARISON_CHAR.search(text):
             return None
         if "!=" in text and "0" not in text:
             return None
         return symbol
 
     def _variable_modified(self, body_cursor, var: str) -> bool:
+        """单趟扫描循环体 token，判断 `continue` 之前是否修改了 var。
+
+        识别 `++var`/`var++`/`--var`/`var--`、复合赋值 (右侧为 0 时忽略) 与普通赋值
+        (自赋值 `var = var` 忽略)。
+        """
+
         if body_cursor is None:
             return False
-        tokens = list(collect_tokens(body_cursor))
+        tokens = self._tokens(body_cursor)
         if not tokens:
             return False
-        text = " ".join(tokens)
-
-        continue_index = text.find("continue")
-
-        inc_pattern = re.compile(rf"(\+\+\s*{var}|{var}\s*\+\+)" )
-        match = inc_pattern.search(text)
-        if match and (continue_index == -1 or match.start() < continue_index):
-            return True
 
-        dec_pattern = re.compile(rf"(--\s*{var}|{var}\s*--)" )
-        match = dec_pattern.search(text)
-        if match and (continue_index == -1 or match.start() < continue_index):
-            return True
+        try:
+            end = tokens.index("continue")
+        except ValueError:
+            end = len(tokens)
 
-        compound_pattern = re.compile(rf"{var}\s*([+\-*/]=)\s*([^;]+)")
-        for match in compound_pattern.finditer(text):
-            if continue_index != -1 and match.start() > continue_index:
+        for index in range(end):
+            token = tokens[index]
+            following = tokens[index + 1] if index + 1 < len(tokens) else None
+            if token == "++" or token == "--":
+                if following == var:
+                    return True
+                continue
+            if token != var:
+                continue
+            if following == "++" or following == "--":
+                return True
+            if following != "=" and following not in _COMPOUND_ASSIGN_OPS:
                 continue
-            op = match.group(1)
-            rhs = match.group(2).strip()
-            if op in {"+=", "-=", "*=", "/="}:
-                if rhs in {"0", "0.0", "0f", "0F"} and op in {"+=", "-=", "*=", "/="}:
-                    continue
-            return True
 
-        assign_pattern = re.compile(rf"{var}\s*=\s*([^;]+)")
-        for match in assign_pattern.finditer(text):
-            if continue_index != -1 and match.start() > continue_index:
+            rhs_start = index + 2
+            try:
+                rhs_end = tokens.index(";", rhs_start)
+            except ValueError:
+                rhs_end = len(tokens)
+            rhs = tokens[rhs_start:rhs_end]
+            if not rhs:
                 continue
-            rhs = match.group(1).strip()
-            rhs = rhs.split(";")[0].strip()
-            if rhs in {var, f"({var})"}:
+            if following == "=":
+                if rhs == [var] or rhs == ["(", var, ")"]:
+                    continue
+            elif len(rhs) == 1 and rhs[0] in _ZERO_LITERALS:
                 continue
             return True
 
         return False
 
     def _analyze_increment(self, var: str, increment_cursor) -> str:
-        increment_text = "".join(collect_tokens(increment_cursor)) if increment_cursor else ""
-        if not increment_text:
+        """按与 `_variable_modified` 相同的 token 精确匹配规则判断增量表达式的方向。"""
+
+        tokens = self._tokens(increment_cursor) if increment_cursor else []
+        if not tokens:
             return "none"
 
-        if re.search(rf"(\+\+\s*{var}|{var}\s*\+\+)", increment_text):
-            return "up"
-        if re.search(rf"(--\s*{var}|{var}\s*--)", increment_text):
-            return "down"
-
-        compound_match = re.search(rf"{var}\s*([+\-]=)\s*([^;]+)", increment_text)
-        if compound_match:
-            op = compound_match.group(1)
-            rhs = compound_match.group(2).strip()
-            if rhs.startswith("-"):
-                return "down" if op == "+=" else "up"
-            return "up" if op == "+=" else "down"
-
-        assign_match = re.search(rf"{var}\s*=\s*{var}\s*([+\-])\s*([^;]+)", increment_text)
-        if assign_match:
-            sign = assign_match.group(1)
-            rhs = assign_match.group(2).strip()
-            if rhs.startswith("-"):
-                return "down" if sign == "+" else "up"
-            return "up" if sign == "+" else "down"
+        count = len(tokens)
+        for index in range(count - 1):
+            if (tokens[index] == "++" and tokens[index + 1] == var) or (
+                tokens[index] == var and tokens[index + 1] == "++"
+            ):
+                return "up"
+        for index in range(count - 1):
+            if (tokens[index] == "--" and tokens[index + 1] == var) or (
+                tokens[index] == var and tokens[index + 1] == "--"
+            ):
+                return "down"
+
+        for index in range(count - 1):
+            if tokens[index] != var:
+                continue
+            following = tokens[index + 1]
+            if following in ("+=", "-="):
+                rhs = self._increment_rhs(tokens, index + 2)
+                if rhs:
+                    positive = following == "+="
+                    if rhs[0] == "-":
+                        positive = not positive
+                    return "up" if positive else "down"
+            elif (
+                following == "="
+                and index + 3 < count
+                and tokens[index + 2] == var
+                and tokens[index + 3] in ("+", "-")
+            ):
+                rhs = self._increment_rhs(tokens, index + 4)
+                if rhs:
+                    positive = tokens[index + 3] == "+"
+                    if rhs[0] == "-":
+                        positive = not positive
+                    return "up" if positive else "down"
 
         return "none"
 
+    @staticmethod
+    def _increment_rhs(tokens: List[str], start: int) -> List[str]:
+        try:
+            end = tokens.index(";", start)
+        except ValueError:
+            end = len(tokens)
+        return tokens[start:end]
+
     def _check_unreachable(self, cursor) -> Iterable[Issue]:
-        children = list(iter_children(cursor))
+        terminal_kinds = self._terminal_kinds
+        children = self._context.children(cursor)
         issues: List[Issue] = []
         encountered_terminal = False
         for child in children:
             if encountered_terminal:
-                file_path, line, column = cursor_location(child)
+                file_path, line, column = self._context.location(child)
                 issues.append(
                     Issue(
                         category="control-flow",
@@ -300,19 +347,12 @@ class NumericControlChecker(Checker):
                         file=file_path,
                         line=line,
                         column=column,
-                        suggestion=Suggestion(
-                            title="删除或移动不可达代码",
-                            detail="如果需要执行，请调整控制流以确保执行到。",
-                        ),
+                        suggestion=_UNREACHABLE_SUGGESTION,
                     )
                 )
                 break
 
-            if child.kind in {
-                load_clang().CursorKind.RETURN_STMT,
-                load_clang().CursorKind.BREAK_STMT,
-                load_clang().CursorKind.CONTINUE_STMT,
-            }:
+            if child.kind in terminal_kinds:
                 encountered_terminal = True
         return issues
 
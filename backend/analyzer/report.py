@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, TextIO
 
 
 Severity = str
@@ -21,6 +23,17 @@ class Suggestion:
             data["detail"] = self.detail
         return data
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "Suggestion":
+        return cls(title=data["title"], detail=data.get("detail"))
+
+
+@lru_cache(maxsize=4096)
+def make_suggestion(title: str, detail: Optional[str] = None) -> Suggestion:
+    """复用相同内容的 Suggestion，避免同类问题重复分配；调用方不应修改返回值。"""
+
+    return Suggestion(title=title, detail=detail)
+
 
 @dataclass(slots=True)
 class Issue:
@@ -46,6 +59,19 @@ class Issue:
             data["suggestion"] = self.suggestion.to_dict()
         return data
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Issue":
+        suggestion = data.get("suggestion")
+        return cls(
+            category=data["category"],
+            severity=data["severity"],
+            message=data["message"],
+            file=Path(data["file"]),
+            line=data["line"],
+            column=data.get("column"),
+            suggestion=Suggestion.from_dict(suggestion) if suggestion else None,
+        )
+
 
 class Report:
     """单个源文件的检测报告。"""
@@ -72,31 +98,38 @@ class Report:
         }
 
     def format_text(self) -> str:
-        lines: List[str] = []
-        lines.append(f"文件: {self.source}")
+        buffer = io.StringIO()
+        self.write_text(buffer)
+        return buffer.getvalue()
+
+    def write_text(self, out: TextIO) -> None:
+        """将文本报告直接写入流 (末尾不含换行)，不在内存中拼接完整报告。"""
+
+        write = out.write
+        write(f"文件: {self.source}\n")
         summary = self.severity_summary()
         if summary:
             summary_text = ", ".join(f"{k}={v}" for k, v in sorted(summary.items()))
         else:
             summary_text = "无问题"
-        lines.append(f"统计: {summary_text}")
+        write(f"统计: {summary_text}")
         if not self.issues:
-            lines.append("  ✅ 未检测到问题")
-            return "\n".join(lines)
+            write("\n  ✅ 未检测到问题")
+            return
 
         for issue in self.issues:
-            location = f"{issue.file}:{issue.line}"
-            if issue.column is not None:
-                location += f":{issue.column}"
-            lines.append(f"  [{issue.severity.upper()}][{issue.category}] {location}: {issue.message}")
-            if issue.suggestion:
-                lines.append(f"    ↳ 建议: {issue.suggestion.title}")
-                if issue.suggestion.detail:
-                    detail_lines = issue.suggestion.detail.strip().splitlines()
-                    for detail in detail_lines:
-                        lines.append(f"       {detail}")
-        return "\n".join(lines)
-
-
-__all__ = ["Issue", "Report", "Severity", "Suggestion"]
+            column = f":{issue.column}" if issue.column is not None else ""
+            write(
+                f"\n  [{issue.severity.upper()}][{issue.category}] "
+                f"{issue.file}:{issue.line}{column}: {issue.message}"
+            )
+            suggestion = issue.suggestion
+            if suggestion:
+                write(f"\n    ↳ 建议: {suggestion.title}")
+                if suggestion.detail:
+                    for detail in suggestion.detail.strip().splitlines():
+                        write(f"\n       {detail}")
+
+
+__all__ = ["Issue", "Report", "Severity", "Suggestion", "make_suggestion"]
 
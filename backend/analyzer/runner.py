@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterator, List, Optional, Sequence
 
 from ..config import AnalyzerConfig, DEFAULT_CONFIG
 from .ast_parser import ASTParser
 from .base import Checker
+from .cache import AnalysisCache, hash_content, hash_options
 from .context import AnalysisContext
 from .memory_checker import MemorySafetyChecker
 from .numeric_control_checker import NumericControlChecker
@@ -19,15 +22,31 @@ from .variable_checker import VariableUsageChecker
 class AnalyzerRunner:
     def __init__(self, config: AnalyzerConfig | None = None):
         self.config = config or DEFAULT_CONFIG
-        self.parser = ASTParser(self.config.compile_args)
         self.checkers: List[Checker] = [
             MemorySafetyChecker(),
             VariableUsageChecker(),
             StdLibHelperChecker(),
             NumericControlChecker(),
         ]
+        self.parser = ASTParser(
+            self.config.compile_args,
+            detailed_preprocessing=any(checker.needs_preprocessing_record for checker in self.checkers),
+            cache_dir=self.config.tu_cache_dir,
+            reuse_translation_units=self.config.reuse_translation_units,
+        )
+        self.cache: AnalysisCache | None = None
+        if self.config.cache_path is not None:
+            self.cache = AnalysisCache(self.config.cache_path)
+            self._options_hash = hash_options(self.config.compile_args, self.config.stop_on_error)
 
     def analyze(self, source: Path) -> Report:
+        content_hash = None
+        if self.cache is not None:
+            content_hash = hash_content(source)
+            cached = self.cache.load(source, self._options_hash, content_hash)
+            if cached is not None:
+                return Report(source, cached)
+
         try:
             translation_unit = self.parser.parse(source)
         except Exception as exc:
@@ -50,18 +69,76 @@ class AnalyzerRunner:
 
         issues: List[Issue] = []
         for checker in self.checkers:
-            issues.extend(checker.run(context))
-            if self.config.stop_on_error and any(issue.severity == "error" for issue in issues):
+            found = list(checker.run(context))
+            issues.extend(found)
+            # 之前的检查器若已产生错误早已中止，只需检查本轮新增的问题
+            if self.config.stop_on_error and any(issue.severity == "error" for issue in found):
                 break
 
         issues.sort(key=_issue_sort_key)
+        if self.cache is not None:
+            dependencies = [inc.include.name for inc in translation_unit.get_includes()]
+            self.cache.store(source, self._options_hash, content_hash, issues, dependencies)
         return Report(source, issues)
 
+    def analyze_many(self, sources: Sequence[Path], max_workers: Optional[int] = None) -> List[Report]:
+        """在多个进程中并行分析多个源文件，按输入顺序返回报告。"""
+
+        return list(self.iter_analyze(sources, max_workers))
+
+    def iter_analyze(self, sources: Sequence[Path], max_workers: Optional[int] = None) -> Iterator[Report]:
+        """并行分析多个源文件，按输入顺序逐个产出报告，调用方可边分析边输出。
+
+        TranslationUnit 无法跨进程传递，每个工作进程各自构建一个 AnalyzerRunner。
+        启用 `stop_on_error` 时与串行分析一致：产出到首个含错误的报告为止；
+        提前结束迭代时取消尚未开始的任务。
+        """
+
+        sources = list(sources)
+        stop_on_error = self.config.stop_on_error
+        workers = min(max_workers or os.cpu_count() or 1, len(sources))
+        if workers <= 1:
+            for source in sources:
+                report = self.analyze(source)
+                yield report
+                if stop_on_error and report.has_errors:
+                    return
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.config,),
+        )
+        try:
+            chunksize = max(1, len(sources) // (4 * workers))
+            for report in executor.map(_analyze_worker, sources, chunksize=chunksize):
+                yield report
+                if stop_on_error and report.has_errors:
+                    return
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+# 工作进程内复用的 AnalyzerRunner，由 _init_worker 在进程启动时创建
+_worker_runner: Optional[AnalyzerRunner] = None
+
+
+def _init_worker(config: AnalyzerConfig) -> None:
+    global _worker_runner
+    _worker_runner = AnalyzerRunner(config)
+
+
+def _analyze_worker(source: Path) -> Report:
+    return _worker_runner.analyze(source)
+
+
+_SEVERITY_RANK = {"error": 0, "warning": 1, "info": 2}
+
 
 def _issue_sort_key(issue: Issue):
-    severity_rank = {"error": 0, "warning": 1, "info": 2}
     return (
-        severity_rank.get(issue.severity, 3),
+        _SEVERITY_RANK.get(issue.severity, 3),
         str(issue.file),
         issue.line,
         issue.column or 0,
@@ -2,14 +2,21 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence
+import re
+from typing import Iterable, List, Optional, Sequence
 
 from .base import Checker
 from .context import AnalysisContext
-from .report import Issue, Suggestion
-from .utils import collect_tokens, cursor_location, find_includes, load_clang
+from .report import Issue, Suggestion, make_suggestion
+from .utils import load_clang
 
 
+# 内容固定的修复建议，所有 Issue 共享同一实例
+_SCANF_ADDRESS_SUGGESTION = Suggestion(
+    title="传入变量地址",
+    detail="示例: `scanf(\"%d\", &value);`",
+)
+
 REQUIRED_HEADERS = {
     "printf": "stdio.h",
     "scanf": "stdio.h",
@@ -26,31 +33,45 @@ REQUIRED_HEADERS = {
 }
 
 
+_REQUIRED_HEADER_NAMES = frozenset(REQUIRED_HEADERS.values())
+
+_FORMAT_FUNCTIONS = frozenset(("printf", "scanf"))
+
 PRINTF_SPECIFIERS = set("diuoxXfFeEgGaAcsp")
 
+# `%%` 不产生参数；其余 `%` 跳过标志/宽度/精度后捕获首个转换字符
+_FORMAT_SPECIFIER = re.compile(r"%(?:%|[^diuoxXfFeEgGaAcsp]*([diuoxXfFeEgGaAcsp]))")
+
 
 class StdLibHelperChecker(Checker):
     name = "stdlib-helper"
 
+    def __init__(self) -> None:
+        # token 取自各检查器共享的 AnalysisContext，仅在 run() 期间持有
+        self._context: Optional[AnalysisContext] = None
+
     def run(self, context: AnalysisContext) -> Iterable[Issue]:
-        cindex = load_clang()
+        CALL_EXPR = load_clang().CursorKind.CALL_EXPR
         issues: List[Issue] = []
+        self._context = context
 
-        includes = find_includes(context.translation_unit)
+        # 只需关心尚未包含的必需头文件，全部已包含时跳过头文件检查
+        missing_headers = _REQUIRED_HEADER_NAMES - context.includes
 
-        for node in self._walk(context.translation_unit.cursor, context):
-            if node.kind != cindex.CursorKind.CALL_EXPR:
+        for node, _ in context.walk():
+            if node.kind != CALL_EXPR:
                 continue
 
             callee = self._resolve_callee(node)
             if not callee:
                 continue
 
-            header = REQUIRED_HEADERS.get(callee)
-            if header and header not in includes:
-                issues.append(self._build_include_issue(node, callee, header))
+            if missing_headers:
+                header = REQUIRED_HEADERS.get(callee)
+                if header in missing_headers:
+                    issues.append(self._build_include_issue(node, callee, header))
 
-            if callee in {"printf", "scanf"}:
+            if callee in _FORMAT_FUNCTIONS:
                 arguments = list(node.get_arguments())
                 if not arguments:
                     continue
@@ -66,29 +87,21 @@ class StdLibHelperChecker(Checker):
                 elif callee == "scanf":
                     issues.extend(self._check_scanf_arguments(value_arguments))
 
+        self._context = None
         return issues
 
-    def _walk(self, cursor, context):
-        stack = [cursor]
-        while stack:
-            current = stack.pop()
-            if current.location.file and current.location.file.name != str(context.source):
-                continue
-            yield current
-            stack.extend(list(current.get_children()))
-
     def _resolve_callee(self, cursor) -> str | None:
         referenced = cursor.referenced
         if referenced and referenced.spelling:
             return referenced.spelling
         name = cursor.spelling or cursor.displayname
         if name:
-            return name.split("(")[0]
+            return name.partition("(")[0]
         return None
 
     def _build_include_issue(self, cursor, callee: str, header: str) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title=f"在头部加入 `#include <{header}>`",
             detail=f"调用 `{callee}` 需要 `{header}` 提供函数声明。",
         )
@@ -103,7 +116,7 @@ class StdLibHelperChecker(Checker):
         )
 
     def _extract_string_literal(self, cursor) -> str | None:
-        tokens = list(collect_tokens(cursor))
+        tokens = self._context.tokens(cursor)
         if not tokens:
             return None
         literal = tokens[0]
@@ -112,26 +125,11 @@ class StdLibHelperChecker(Checker):
         return None
 
     def _parse_format_string(self, fmt: str) -> List[str]:
-        specifiers: List[str] = []
-        i = 0
-        while i < len(fmt):
-            if fmt[i] == "%":
-                i += 1
-                if i < len(fmt) and fmt[i] == "%":
-                    i += 1
-                    continue
-                while i < len(fmt) and fmt[i] not in PRINTF_SPECIFIERS:
-                    i += 1
-                if i < len(fmt):
-                    specifiers.append(fmt[i])
-                    i += 1
-                continue
-            i += 1
-        return specifiers
+        return [spec for spec in _FORMAT_SPECIFIER.findall(fmt) if spec]
 
     def _build_arg_count_issue(self, cursor, callee: str, expected: int, actual: int) -> Issue:
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = self._context.location(cursor)
+        suggestion = make_suggestion(
             title="核对格式化字符串与参数数量",
             detail=f"`{callee}` 需要 {expected} 个参数，但当前传入 {actual} 个。",
         )
@@ -147,13 +145,14 @@ class StdLibHelperChecker(Checker):
 
     def _check_scanf_arguments(self, arguments: Sequence["clang.cindex.Cursor"]):  # type: ignore[name-defined]
         issues: List[Issue] = []
+        POINTER = load_clang().TypeKind.POINTER
         for arg in arguments:
-            arg_tokens = list(collect_tokens(arg))
+            arg_tokens = self._context.tokens(arg)
             arg_type = arg.type
-            is_pointer = arg_type.kind == load_clang().TypeKind.POINTER
+            is_pointer = arg_type.kind == POINTER
             has_address_of = arg_tokens and arg_tokens[0] == "&"
             if not is_pointer and not has_address_of:
-                file_path, line, column = cursor_location(arg)
+                file_path, line, column = self._context.location(arg)
                 issues.append(
                     Issue(
                         category="stdlib",
@@ -162,10 +161,7 @@ class StdLibHelperChecker(Checker):
                         file=file_path,
                         line=line,
                         column=column,
-                        suggestion=Suggestion(
-                            title="传入变量地址",
-                            detail="示例: `scanf(\"%d\", &value);`",
-                        ),
+                        suggestion=_SCANF_ADDRESS_SUGGESTION,
                     )
                 )
         return issues
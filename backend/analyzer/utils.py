@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import ctypes
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Iterator, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
 
 @lru_cache(maxsize=1)
@@ -39,6 +40,43 @@ def iter_children(cursor: "clang.cindex.Cursor") -> Iterator["clang.cindex.Curso
         yield child
 
 
+def collect_source_tree(
+    root: "clang.cindex.Cursor", source: Path  # type: ignore[name-defined]
+) -> tuple[
+    List[tuple["clang.cindex.Cursor", Optional["clang.cindex.Cursor"]]],  # type: ignore[name-defined]
+    Dict["clang.cindex.Cursor", tuple[List["clang.cindex.Cursor"], Optional["clang.cindex.Cursor"]]],  # type: ignore[name-defined]
+]:
+    """以一次递归的 clang_visitChildren 调用遍历 root 下属于 source 的游标。
+
+    返回先序排列的 (游标, 所在函数声明) 列表，以及 游标 -> (子节点列表, 子节点所在
+    函数声明) 的映射。位于其他文件 (如头文件) 的游标连同其子树一并跳过。相比对每个
+    节点调用 `get_children()`，整棵树只跨越一次 FFI 入口。
+    """
+
+    cindex = load_clang()
+    function_decl = cindex.CursorKind.FUNCTION_DECL
+    source_name = str(source)
+    tu = root._tu
+    nodes = [(root, None)]
+    # 游标 -> (子节点列表, 其子节点所在的函数声明)
+    info = {root: ([], root if root.kind == function_decl else None)}
+
+    def visitor(child, parent, _):
+        location_file = child.location.file
+        if location_file and location_file.name != source_name:
+            return 1  # CXChildVisit_Continue：跳过该子树
+        # 与 get_children() 一致，保留对翻译单元的引用以免其被回收
+        child._tu = tu
+        siblings, func_cursor = info[parent]
+        siblings.append(child)
+        nodes.append((child, func_cursor))
+        info[child] = ([], child if child.kind == function_decl else func_cursor)
+        return 2  # CXChildVisit_Recurse
+
+    cindex.conf.lib.clang_visitChildren(root, cindex.callbacks["cursor_visit"](visitor), None)
+    return nodes, info
+
+
 def cursor_location(cursor: "clang.cindex.Cursor") -> tuple[Path, int, Optional[int]]:  # type: ignore[name-defined]
     location = cursor.extent.start
     return Path(location.file.name if location.file else "<unknown>"), location.line, location.column
@@ -51,6 +89,75 @@ def find_includes(translation_unit: "clang.cindex.TranslationUnit") -> set[str]:
     return includes
 
 
+# CXEvalResultKind 中的 CXEval_Int
+_CXEVAL_INT = 1
+
+
+@lru_cache(maxsize=1)
+def _evaluate_functions():
+    """注册 clang_Cursor_Evaluate 系列函数；Python 绑定未包装这些接口。"""
+
+    cindex = load_clang()
+    lib = cindex.conf.lib
+    try:
+        evaluate = lib.clang_Cursor_Evaluate
+        get_kind = lib.clang_EvalResult_getKind
+        as_long_long = lib.clang_EvalResult_getAsLongLong
+        dispose = lib.clang_EvalResult_dispose
+    except AttributeError:  # pragma: no cover - libclang 版本过旧
+        return None
+    evaluate.argtypes = [cindex.Cursor]
+    evaluate.restype = ctypes.c_void_p
+    get_kind.argtypes = [ctypes.c_void_p]
+    get_kind.restype = ctypes.c_int
+    as_long_long.argtypes = [ctypes.c_void_p]
+    as_long_long.restype = ctypes.c_longlong
+    dispose.argtypes = [ctypes.c_void_p]
+    dispose.restype = None
+    return evaluate, get_kind, as_long_long, dispose
+
+
+def evaluate_integer(cursor: "clang.cindex.Cursor") -> Optional[int]:  # type: ignore[name-defined]
+    """用 libclang 求值整型常量表达式，无法求值时返回 None。"""
+
+    functions = _evaluate_functions()
+    if functions is None:
+        return None
+    evaluate, get_kind, as_long_long, dispose = functions
+    result = evaluate(cursor)
+    if not result:
+        return None
+    try:
+        if get_kind(result) != _CXEVAL_INT:
+            return None
+        return as_long_long(result)
+    finally:
+        dispose(result)
+
+
+@lru_cache(maxsize=1)
+def _binary_operator_function():
+    """注册 clang_getCursorBinaryOperatorKind (libclang 17+)；不可用时返回 None。"""
+
+    cindex = load_clang()
+    try:
+        function = cindex.conf.lib.clang_getCursorBinaryOperatorKind
+    except AttributeError:  # pragma: no cover - libclang 版本过旧
+        return None
+    function.argtypes = [cindex.Cursor]
+    function.restype = ctypes.c_int
+    return function
+
+
+def binary_operator_kind(cursor: "clang.cindex.Cursor") -> Optional[int]:  # type: ignore[name-defined]
+    """返回二元运算符游标的 CXBinaryOperatorKind 数值，libclang 不支持时返回 None。"""
+
+    function = _binary_operator_function()
+    if function is None:
+        return None
+    return function(cursor)
+
+
 def collect_tokens(cursor: "clang.cindex.Cursor") -> Iterator[str]:  # type: ignore[name-defined]
     for token in cursor.get_tokens():
         yield token.spelling
@@ -65,8 +172,11 @@ def safe_literal(token_sequence: Iterable[str]) -> Optional[str]:
 
 
 __all__ = [
+    "binary_operator_kind",
+    "collect_source_tree",
     "collect_tokens",
     "cursor_location",
+    "evaluate_integer",
     "find_includes",
     "iter_children",
     "load_clang",
@@ -6,40 +6,47 @@ from typing import Iterable, List, Set
 
 from .base import Checker
 from .context import AnalysisContext
-from .report import Issue, Suggestion
-from .utils import collect_tokens, cursor_location, iter_children, load_clang
+from .report import Issue, Suggestion, make_suggestion
+from .utils import load_clang
+
+
+# 内容固定的修复建议，所有 Issue 共享同一实例
+_UNASSIGNED_USE_SUGGESTION = Suggestion(
+    title="在引用前检查变量赋值路径",
+    detail="可以通过初始化或在所有分支赋值来避免。",
+)
 
 
 class VariableUsageChecker(Checker):
     name = "variable-usage"
 
     def run(self, context: AnalysisContext) -> Iterable[Issue]:
-        cindex = load_clang()
+        kinds = load_clang().CursorKind
         issues: List[Issue] = []
 
-        for cursor in context.translation_unit.cursor.get_children():
-            if cursor.location.file and cursor.location.file.name != str(context.source):
-                continue
-
-            if cursor.kind == cindex.CursorKind.VAR_DECL:
-                issues.extend(self._check_var_decl(cursor))
-            elif cursor.kind == cindex.CursorKind.FUNCTION_DECL:
-                issues.extend(self._check_function(cursor))
+        # 顶层声明与函数体的子节点均取自共享遍历，其他文件中的声明已被剔除
+        for cursor in context.children(context.translation_unit.cursor):
+            kind = cursor.kind
+            if kind == kinds.VAR_DECL:
+                issues.extend(self._check_var_decl(context, cursor))
+            elif kind == kinds.FUNCTION_DECL:
+                issues.extend(self._check_function(context, cursor))
 
         return issues
 
-    def _check_var_decl(self, cursor) -> Iterable[Issue]:
-        if cursor.storage_class == load_clang().StorageClass.EXTERN:
+    def _check_var_decl(self, context: AnalysisContext, cursor) -> Iterable[Issue]:
+        cindex = load_clang()
+        if cursor.storage_class == cindex.StorageClass.EXTERN:
             return []
 
-        if list(cursor.get_children()):
+        if context.children(cursor):
             return []
 
-        if cursor.type.kind == load_clang().TypeKind.POINTER:
+        if cursor.type.kind == cindex.TypeKind.POINTER:
             return []
 
-        file_path, line, column = cursor_location(cursor)
-        suggestion = Suggestion(
+        file_path, line, column = context.location(cursor)
+        suggestion = make_suggestion(
             title=f"在声明 `{cursor.spelling}` 时完成初始化",
             detail="例如: `int value = 0;` 或在首次使用前显式赋值。",
         )
@@ -55,8 +62,13 @@ class VariableUsageChecker(Checker):
             )
         ]
 
-    def _check_function(self, cursor) -> Iterable[Issue]:
+    def _check_function(self, context: AnalysisContext, cursor) -> Iterable[Issue]:
         cindex = load_clang()
+        kinds = cindex.CursorKind
+        VAR_DECL = kinds.VAR_DECL
+        BINARY_OPERATOR = kinds.BINARY_OPERATOR
+        DECL_REF_EXPR = kinds.DECL_REF_EXPR
+        POINTER = cindex.TypeKind.POINTER
         assigned: Set[str] = set()
         reported: Set[str] = set()
         issues: List[Issue] = []
@@ -65,34 +77,35 @@ class VariableUsageChecker(Checker):
             if param.spelling:
                 assigned.add(param.spelling)
 
-        for node in self._walk(cursor):
-            if node.kind == cindex.CursorKind.VAR_DECL and node.spelling:
-                has_initializer = any(True for _ in node.get_children())
-                if has_initializer:
-                    assigned.add(node.spelling)
+        for node in self._walk(context, cursor):
+            kind = node.kind
+            if kind == VAR_DECL:
+                spelling = node.spelling
+                if spelling and context.children(node):
+                    assigned.add(spelling)
 
-            if node.kind == cindex.CursorKind.BINARY_OPERATOR:
-                children = list(node.get_children())
+            elif kind == BINARY_OPERATOR:
+                children = context.children(node)
                 if children:
                     left = children[0]
-                    if left.kind == cindex.CursorKind.DECL_REF_EXPR and left.spelling:
+                    if left.kind == DECL_REF_EXPR and left.spelling:
                         ref = left.referenced
-                        if ref and ref.kind == cindex.CursorKind.VAR_DECL:
+                        if ref and ref.kind == VAR_DECL:
                             assigned.add(left.spelling)
 
-            if node.kind == cindex.CursorKind.DECL_REF_EXPR:
+            elif kind == DECL_REF_EXPR:
                 ref = node.referenced
-                if not ref or ref.kind != cindex.CursorKind.VAR_DECL:
+                if not ref or ref.kind != VAR_DECL:
                     continue
 
                 name = node.spelling
                 if not name or name in assigned or name in reported:
                     continue
 
-                if node.type.kind == load_clang().TypeKind.POINTER:
+                if node.type.kind == POINTER:
                     continue
 
-                file_path, line, column = cursor_location(node)
+                file_path, line, column = context.location(node)
                 issues.append(
                     Issue(
                         category="variable",
@@ -101,20 +114,20 @@ class VariableUsageChecker(Checker):
                         file=file_path,
                         line=line,
                         column=column,
-                        suggestion=Suggestion(
-                            title="在引用前检查变量赋值路径",
-                            detail="可以通过初始化或在所有分支赋值来避免。",
-                        ),
+                        suggestion=_UNASSIGNED_USE_SUGGESTION,
                     )
                 )
                 reported.add(name)
 
         return issues
 
-    def _walk(self, cursor):
-        yield cursor
-        for child in iter_children(cursor):
-            yield from self._walk(child)
+    def _walk(self, context: AnalysisContext, cursor):
+        stack = [cursor]
+        while stack:
+            current = stack.pop()
+            yield current
+            # 逆序入栈以保持先序遍历顺序
+            stack.extend(reversed(context.children(current)))
 
 
 __all__ = ["VariableUsageChecker"]
@@ -7,13 +7,17 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import sys
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
-from .analyzer.runner import AnalyzerRunner
+from .analyzer.ast_parser import DEFAULT_TU_CACHE_DIR
+from .analyzer.cache import DEFAULT_CACHE_PATH
+from .analyzer.report import Report
 from .config import AnalyzerConfig, DEFAULT_CONFIG
+from .serialization import write_json_array
+from .watcher import FileWatcher
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -33,6 +37,11 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="以 JSON 格式输出完整报告",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="与 --json 同用时输出不含缩进的紧凑 JSON，适合程序读取",
+    )
     parser.add_argument(
         "--output",
         type=Path,
@@ -44,16 +53,48 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="遇到首个错误时立即停止后续检查",
     )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        default=None,
+        metavar="DB",
+        help=f"复用未修改文件的检测结果，可指定缓存数据库 (默认 {DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--tu-cache",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_TU_CACHE_DIR,
+        default=None,
+        metavar="DIR",
+        help=f"将解析得到的 AST 序列化保存并在文件未修改时直接加载 (默认 {DEFAULT_TU_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="并行分析的进程数 (默认使用全部 CPU 核心，1 表示串行)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="持续监视源文件，仅重新分析发生修改的文件 (Ctrl+C 退出)",
+    )
     return parser
 
 
 def _normalize_sources(sources: Iterable[str]) -> List[Path]:
     result: List[Path] = []
     for src in sources:
-        path = Path(src).resolve()
-        if not path.exists():
-            raise FileNotFoundError(f"未找到源码文件: {path}")
-        result.append(path)
+        # strict 模式在解析符号链接的同一次遍历中完成存在性检查
+        try:
+            path = os.path.realpath(src, strict=True)
+        except OSError:
+            raise FileNotFoundError(f"未找到源码文件: {os.path.abspath(src)}") from None
+        result.append(Path(path))
     return result
 
 
@@ -61,36 +102,70 @@ def main(argv: List[str] | None = None) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
 
-    compile_args = args.compile_arg if args.compile_arg is not None else DEFAULT_CONFIG.compile_args
+    compile_args = tuple(args.compile_arg) if args.compile_arg is not None else DEFAULT_CONFIG.compile_args
     config = AnalyzerConfig(
-        compile_args=list(compile_args),
+        compile_args=compile_args,
         enable_suggestions=True,
         stop_on_error=args.stop_on_error,
+        cache_path=args.cache,
+        tu_cache_dir=args.tu_cache,
+        reuse_translation_units=args.watch,
     )
 
-    runner = AnalyzerRunner(config=config)
     sources = _normalize_sources(args.sources)
 
-    reports = []
-    for src in sources:
-        report = runner.analyze(src)
-        reports.append(report)
-        if config.stop_on_error and report.has_errors:
-            break
+    # 运行器会加载全部检查器，推迟到参数与源文件校验通过后再导入，`--help` 等调用无需承担
+    from .analyzer.runner import AnalyzerRunner
+
+    # 整个进程只构建一个运行器并在所有文件 (含监视模式的重新分析) 之间复用，
+    # 其中的 Index、结果缓存连接与保留的 TranslationUnit 不会在文件之间重置；
+    # 并行分析时每个工作进程同样只构建一个运行器
+    runner = AnalyzerRunner(config=config)
+
+    # 报告按输入顺序边分析边输出；--stop-on-error 时在首个含错误的报告后停止，
+    # 监视模式还需保留全部报告以便之后重写输出
+    reports: List[Report] = []
+
+    def _collect() -> Iterator[Report]:
+        for report in runner.iter_analyze(sources, max_workers=args.jobs):
+            reports.append(report)
+            yield report
+
+    _write_reports(_collect(), args)
 
-    output = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    if args.watch:
+        analyzed = [report.source for report in reports]
+        try:
+            for changed in FileWatcher(analyzed).watch():
+                for src in changed:
+                    reports[analyzed.index(src)] = runner.analyze(src)
+                _write_reports(reports, args)
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
+
+def _write_reports(reports: Iterable[Report], args: argparse.Namespace) -> None:
+    # 以二进制写出已编码的 UTF-8，省去文本层的再次编码
+    if args.output:
+        output = args.output.open("wb")
+    else:
+        sys.stdout.flush()
+        output = sys.stdout.buffer
     try:
         if args.json:
-            json.dump([r.to_dict() for r in reports], output, ensure_ascii=False, indent=2)
+            write_json_array(output, (r.to_dict() for r in reports), indent=not args.compact)
         else:
             for report in reports:
-                output.write(report.format_text())
-                output.write("\n")
+                output.write(report.format_text().encode("utf-8"))
+                output.write(b"\n")
+                output.flush()
     finally:
         if args.output:
             output.close()
-
-    return 0
+        else:
+            output.flush()
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI 入口
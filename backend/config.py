@@ -5,17 +5,28 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class AnalyzerConfig:
-    """分析器运行配置。"""
+    """分析器运行配置。
 
-    compile_args: List[str] = field(default_factory=lambda: ["-std=c11"])
+    配置不可变且可哈希，默认编译参数可在各实例之间共享；需要调整时使用
+    `dataclasses.replace` 生成新配置。
+    """
+
+    compile_args: Tuple[str, ...] = ("-std=c11",)
     enable_suggestions: bool = True
     stop_on_error: bool = False
+    # 结果缓存数据库路径，None 表示不启用缓存
+    cache_path: Optional[Path] = None
+    # 序列化 TranslationUnit 的缓存目录，None 表示每次都重新解析
+    tu_cache_dir: Optional[Path] = None
+    # 保留各文件的 TranslationUnit 并在重复分析时增量 reparse，适用于监视模式
+    reuse_translation_units: bool = False
 
 
 DEFAULT_CONFIG = AnalyzerConfig()
@@ -0,0 +1,63 @@
+"""JSON 输出工具。
+
+安装了 orjson 时使用它序列化报告 (显著快于标准库 json)，否则退回标准库；
+两者输出格式一致：UTF-8 原样输出非 ASCII 字符，缩进 2 个空格或不含空白的紧凑格式。
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from typing import BinaryIO, Iterable
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+
+def dumps_json(data: object, indent: bool = True) -> bytes:
+    """将 data 序列化为 UTF-8 JSON 字节串，可直接写入二进制流。
+
+    `indent=False` 时输出紧凑格式，供程序读取。
+    """
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=_encode_default).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_encode_default).encode("utf-8")
+
+
+def _encode_default(value: object) -> object:
+    # 与 orjson 一致：日期时间输出为 ISO 8601 字符串
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_json_array(output: BinaryIO, items: Iterable[object], indent: bool = True) -> None:
+    """逐个序列化元素并写出 JSON 数组，不需要先构建完整列表。
+
+    输出与 `dumps_json(list(items), indent)` 逐字节相同：JSON 字符串中的换行均已转义，
+    因此给每个元素的各行加两个空格即可得到外层数组的缩进。
+    """
+
+    if not indent:
+        output.write(b"[")
+        for index, item in enumerate(items):
+            if index:
+                output.write(b",")
+            output.write(dumps_json(item, indent=False))
+        output.write(b"]")
+        return
+
+    first = True
+    for item in items:
+        output.write(b"[\n  " if first else b",\n  ")
+        output.write(dumps_json(item).replace(b"\n", b"\n  "))
+        first = False
+    output.write(b"[]" if first else b"\n]")
+
+
+__all__ = ["dumps_json", "write_json_array"]
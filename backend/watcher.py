@@ -0,0 +1,53 @@
+"""源文件变更监视。
+
+以轮询方式比较文件的修改时间与大小，供 CLI 的 `--watch` 模式仅对发生变化的
+文件重新分析。
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+_Stamp = Optional[Tuple[int, int]]
+
+
+def _stamp(path: Path) -> _Stamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """记录一组文件的状态，并报告自上次检查以来被修改的文件。"""
+
+    def __init__(self, sources: Iterable[Path], interval: float = 1.0):
+        self.interval = interval
+        self._stamps: Dict[Path, _Stamp] = {path: _stamp(path) for path in sources}
+
+    def poll(self) -> List[Path]:
+        changed: List[Path] = []
+        for path, previous in self._stamps.items():
+            current = _stamp(path)
+            if current != previous:
+                self._stamps[path] = current
+                # 文件被删除时不触发重新分析，待其重新出现后再处理
+                if current is not None:
+                    changed.append(path)
+        return changed
+
+    def watch(self) -> Iterator[List[Path]]:
+        """持续轮询，每当有文件变化时产出变化的文件列表。"""
+
+        while True:
+            time.sleep(self.interval)
+            changed = self.poll()
+            if changed:
+                yield changed
+
+
+__all__ = ["FileWatcher"]
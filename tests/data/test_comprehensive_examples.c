@@ -495,6 +495,91 @@ void test_use_after_free() {
     free(ptr5); // BUG: double free
 }
 
+// ============================================================================
+// TEST EXAMPLE 8: Loop Variable Name Matching
+// ============================================================================
+
+void test_loop_variable_in_increment(int limit) {
+    // Increment only changes xi, i never reaches limit
+    int xi = 0;
+    for(int i = 0; i < limit; xi++) { // BUG: infinite loop
+        printf("xi = %d\n", xi);
+    }
+}
+
+void test_loop_variable_in_body(int limit) {
+    // Body only changes xj, j never reaches limit
+    int j = 0;
+    int xj = 0;
+    while(j < limit) { // BUG: infinite loop
+        xj++;
+    }
+}
+
+void test_loop_variable_exact(int limit) {
+    // Both loops change the exact condition variable, no issue expected
+    for(int k = 0; k < limit; k++) {
+        printf("k = %d\n", k);
+    }
+    int t = 0;
+    while(t < limit) {
+        t++;
+    }
+}
+
+// ============================================================================
+// TEST EXAMPLE 9: Local Array Bounds
+// ============================================================================
+
+void test_local_array_bounds() {
+    int local_buf[4];
+    local_buf[3] = 1;
+    local_buf[4] = 2; // BUG: index out of bounds
+    printf("local_buf[3] = %d\n", local_buf[3]);
+}
+
+// ============================================================================
+// TEST EXAMPLE 10: Pointer Aliases
+// ============================================================================
+
+void test_free_through_alias() {
+    int* owner = (int*)malloc(sizeof(int));
+    int* alias = owner;
+    free(alias);
+    *owner = 1; // BUG: use after free through alias
+}
+
+void test_alias_reassigned() {
+    int* owner = (int*)malloc(sizeof(int));
+    int* alias = owner;
+    alias = (int*)malloc(sizeof(int));
+    free(alias);
+    *owner = 2; // owner was not freed
+    free(owner);
+}
+
+void test_alias_of_uninitialized() {
+    int* wild;
+    int* alias = wild;
+    *alias = 3; // BUG: alias of an uninitialized pointer
+}
+
+// ============================================================================
+// TEST EXAMPLE 11: Division By Zero
+// ============================================================================
+
+#define ZERO_DIVISOR 0
+
+int test_division_by_zero(int a, int b) {
+    int by_macro = a / ZERO_DIVISOR; // BUG: division by zero through a macro
+    // Only the division is reported; the enclosing expressions starting on
+    // the line above must not be reported again
+    int nested = (b +
+                  a / 0) * 2; // BUG: division by zero
+    int safe = a / 2;
+    return by_macro + nested + safe;
+}
+
 // ============================================================================
 // MAIN FUNCTION
 // ============================================================================
@@ -532,6 +617,22 @@ int main() {
     printf("\nTesting use-after-free...\n");
     test_use_after_free();
     
+    printf("\nTesting loop variable name matching...\n");
+    test_loop_variable_in_increment(10);
+    test_loop_variable_in_body(10);
+    test_loop_variable_exact(10);
+    
+    printf("\nTesting local array bounds...\n");
+    test_local_array_bounds();
+    
+    printf("\nTesting pointer aliases...\n");
+    test_free_through_alias();
+    test_alias_reassigned();
+    test_alias_of_uninitialized();
+    
+    printf("\nTesting division by zero...\n");
+    test_division_by_zero(10, 2);
+    
     printf("\n=== ALL TESTS COMPLETED ===\n");
     
     return 0;
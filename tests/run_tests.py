@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 import json
+import os
+import sqlite3
 import sys
+import tempfile
+from collections import defaultdict, deque
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 
@@ -16,7 +21,10 @@ EXPECTED_FILE = PROJECT_ROOT / "tests" / "expected_results.json"
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from backend.analyzer.cache import CACHE_VERSION
 from backend.analyzer.runner import AnalyzerRunner
+from backend.config import DEFAULT_CONFIG
+from backend.serialization import dumps_json
 
 
 def load_expected():
@@ -28,42 +36,50 @@ def load_expected():
 
 def run() -> Path:
     runner = AnalyzerRunner()
-    sources = sorted(DATA_DIR.glob("*.c"))
+    # 单次 scandir 即可判断文件类型，无需为每个条目单独 stat
+    with os.scandir(DATA_DIR) as entries:
+        sources = sorted(Path(entry.path) for entry in entries if entry.name.endswith(".c") and entry.is_file())
     expected = load_expected()
-    pending_expected = expected.copy()
+    # (类别, 行号) -> 尚未匹配的期望项，保持原有顺序
+    pending_expected = defaultdict(deque)
+    for rule in expected:
+        pending_expected[(rule.get("category"), rule.get("line"))].append(rule)
 
     reports = []
     raw_outputs = []
     true_positive = 0
+    total_issues = 0
 
-    for source in sources:
-        report = runner.analyze(source)
+    # 各源文件在独立进程中并行分析，报告仍按文件顺序逐一统计
+    for report in runner.analyze_many(sources):
         reports.append(report.to_dict())
         raw_text = report.format_text()
         raw_outputs.append(raw_text)
+        total_issues += len(report.issues)
 
-        matched_indices: set[int] = set()
+        # 同一文件内的多个问题可命中同一期望项，文件处理完后每个键只消耗一项
+        matched_keys: set[tuple] = set()
 
         for issue in report.issues:
-            match_index = _match_expected(issue, pending_expected)
-            if match_index is not None:
+            key = (issue.category, issue.line)
+            if pending_expected.get(key):
                 true_positive += 1
-                matched_indices.add(match_index)
-
-        for idx in sorted(matched_indices, reverse=True):
-            pending_expected.pop(idx)
+                matched_keys.add(key)
 
-    false_negative = len(pending_expected)
+        for key in matched_keys:
+            pending_expected[key].popleft()
 
-    total_issues = sum(len(r["issues"]) for r in reports)
+    false_negative = sum(len(bucket) for bucket in pending_expected.values())
     false_positive = total_issues - true_positive
 
     LOG_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    # 文件名与 generated_at 取同一时刻
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d-%H%M%S")
     log_path = LOG_DIR / f"analysis-log-{timestamp}.json"
 
     log_data = {
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": now,
         "sources": [str(src) for src in sources],
         "reports": reports,
         "raw_output": "\n\n".join(raw_outputs),
@@ -76,20 +92,134 @@ def run() -> Path:
         "expected_reference": expected,
     }
 
-    with log_path.open("w", encoding="utf-8") as f:
-        json.dump(log_data, f, ensure_ascii=False, indent=2)
+    # 日志供程序读取，使用紧凑格式；一次写入完整字节串，超过缓冲区大小的写入会直接交给系统调用。
+    # 先写入同目录下按进程区分的临时文件再原子替换，中途失败不会留下截断的日志，
+    # 同一秒内并发运行也不会交错写入同一文件
+    tmp_path = log_path.with_name(f"{log_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(dumps_json(log_data, indent=False))
+        os.replace(tmp_path, log_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
     return log_path
 
 
-def _match_expected(issue, expected):
-    for index, rule in enumerate(expected):
-        if issue.category == rule.get("category") and issue.line == rule.get("line"):
-            return index
-    return None
+def _expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def _record_calls(owner, attribute: str) -> list:
+    """替换 owner 上的方法，记录每次调用的首个参数后照常执行。"""
+
+    method = getattr(owner, attribute)
+    calls: list = []
+
+    def recording(first, *args, **kwargs):
+        calls.append(first)
+        return method(first, *args, **kwargs)
+
+    setattr(owner, attribute, recording)
+    return calls
+
+
+def _counting_runner(config) -> tuple[AnalyzerRunner, list]:
+    """构建 AnalyzerRunner 并记录每次实际调用 clang 解析的源文件。"""
+
+    runner = AnalyzerRunner(config)
+    return runner, _record_calls(runner.parser, "parse")
+
+
+def check_result_cache() -> None:
+    """验证结果缓存：未修改时命中，源码或头文件变化后失效，CACHE_VERSION 变化时重建。"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        source = tmp_dir / "cached.c"
+        header = tmp_dir / "divisor.h"
+        db_path = tmp_dir / "results.db"
+        header.write_text("#define DIVISOR 10\n", encoding="utf-8")
+        source.write_text(
+            '#include "divisor.h"\n\nint ratio(int a) {\n    return a / DIVISOR;\n}\n',
+            encoding="utf-8",
+        )
+        config = replace(DEFAULT_CONFIG, cache_path=db_path)
+
+        runner, parsed = _counting_runner(config)
+        first = runner.analyze(source)
+        second = runner.analyze(source)
+        _expect(len(parsed) == 1, "未修改的源文件应命中结果缓存")
+        _expect(second.to_dict() == first.to_dict(), "缓存结果应与首次分析一致")
+
+        source.write_text(source.read_text(encoding="utf-8") + "// edited\n", encoding="utf-8")
+        runner.analyze(source)
+        _expect(len(parsed) == 2, "源码内容变化后应重新分析")
+
+        header.write_text("#define DIVISOR 0\n", encoding="utf-8")
+        report = runner.analyze(source)
+        _expect(len(parsed) == 3, "头文件变化后应重新分析")
+        _expect(any(issue.category == "numeric" for issue in report.issues), "头文件中的除数改为 0 后应报告除零")
+        runner.analyze(source)
+        _expect(len(parsed) == 3, "重新分析的结果应再次写入缓存")
+        runner.cache.close()
+
+        # 模拟旧版本写入的数据库：重新打开时应丢弃旧表
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute(f"PRAGMA user_version = {CACHE_VERSION - 1}")
+        conn.close()
+        runner, parsed = _counting_runner(config)
+        runner.analyze(source)
+        _expect(len(parsed) == 1, "CACHE_VERSION 变化后应重建缓存并重新分析")
+        runner.cache.close()
+
+
+def check_tu_cache() -> None:
+    """验证 `.ast` 缓存：加载得到的报告与重新解析一致，源码或头文件修改后重新解析并覆盖条目。"""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        source = tmp_dir / "cached.c"
+        source.write_bytes((DATA_DIR / "test_comprehensive_examples.c").read_bytes())
+        fresh = AnalyzerRunner().analyze(source).to_dict()
+
+        runner = AnalyzerRunner(replace(DEFAULT_CONFIG, tu_cache_dir=tmp_dir / "tu"))
+        parsed = _record_calls(runner.parser.index, "parse")
+        first = runner.analyze(source).to_dict()
+        _expect(len(parsed) == 1 and any((tmp_dir / "tu").glob("*.ast")), "首次分析应解析源码并写入 .ast 缓存")
+        loaded = runner.analyze(source).to_dict()
+        _expect(len(parsed) == 1, "未修改的源文件应直接加载 .ast 缓存")
+        _expect(first == fresh and loaded == fresh, "加载 .ast 得到的报告应与重新解析一致")
+
+        with source.open("a", encoding="utf-8") as f:
+            f.write("\nint added_after_cache(int a) {\n    return a / 0;\n}\n")
+        modified = runner.analyze(source)
+        _expect(len(parsed) == 2, "源码修改后应重新解析")
+        _expect(len(list((tmp_dir / "tu").glob("*.ast"))) == 1, "修改后的源码应覆盖原有 .ast 缓存而非另存")
+        runner.analyze(source)
+        _expect(len(parsed) == 2, "覆盖后的 .ast 缓存应再次命中")
+        _expect(len(modified.issues) == len(loaded["issues"]) + 1, "重新解析的结果应包含新增代码中的问题")
+
+        # 头文件不在缓存键中：修改后 libclang 拒绝加载旧 AST，自动重新解析
+        header = tmp_dir / "divisor.h"
+        header_user = tmp_dir / "header_user.c"
+        header.write_text("#define DIVISOR 10\n", encoding="utf-8")
+        header_user.write_text('#include "divisor.h"\n\nint ratio(int a) {\n    return a / DIVISOR;\n}\n', encoding="utf-8")
+        runner.analyze(header_user)
+        runner.analyze(header_user)
+        _expect(len(parsed) == 3, "头文件未变化时应直接加载 .ast 缓存")
+        header.write_text("#define DIVISOR 0\n", encoding="utf-8")
+        report = runner.analyze(header_user)
+        _expect(len(parsed) == 4, "头文件修改后应重新解析")
+        _expect(any(issue.category == "numeric" for issue in report.issues), "重新解析应反映头文件中的新定义")
 
 
 if __name__ == "__main__":  # pragma: no cover - 手动执行
     path = run()
     print(f"日志已生成: {path}")
+    check_result_cache()
+    print("结果缓存检查通过")
+    check_tu_cache()
+    print(".ast 缓存检查通过")
 